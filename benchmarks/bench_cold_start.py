@@ -0,0 +1,52 @@
+"""
+Benchmark: cold-start time of SMEBusinessAgent with lazy vs eager loading
+
+Each scenario runs in a fresh interpreter so import and model-loading
+costs are counted in full.
+
+Usage: python benchmarks/bench_cold_start.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.append('src')
+from agent import SMEBusinessAgent
+imported = time.perf_counter()
+agent = SMEBusinessAgent()
+if {eager}:
+    # What the constructor used to do: load the model and sync the vector store
+    agent.warm_up(background=False)
+constructed = time.perf_counter()
+agent.simple_query("What was the profit in May 2023?")
+answered = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "construct": constructed - imported,
+    "first_answer": answered - start,
+}}))
+"""
+
+
+def run(eager: bool) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(eager=eager)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    lazy = run(eager=False)
+    eager = run(eager=True)
+
+    print(f"{'':14} {'import':>8} {'construct':>10} {'first answer':>13}")
+    for name, timings in (("eager (old)", eager), ("lazy", lazy)):
+        print(f"{name:14} {timings['import']:7.2f}s {timings['construct']:9.2f}s {timings['first_answer']:12.2f}s")
+    print(f"\nTime to first tool-based answer: {eager['first_answer']:.2f}s -> {lazy['first_answer']:.2f}s")
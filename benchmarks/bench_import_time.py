@@ -0,0 +1,82 @@
+"""
+Import-time budget for the entry points, driven by ``python -X importtime``
+
+For each entry point this reports the cumulative import cost, the heaviest
+top-level packages it pulled in, and fails (exit code 1) if the module is
+over its time budget or imports a library that should only load on demand.
+
+Usage: python benchmarks/bench_import_time.py [--scale FACTOR]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Cumulative import budget per entry point, in milliseconds
+BUDGETS_MS = {
+    "main": 1500,
+    "sme_business_agent": 1200,
+    "web_interface": 1200,
+}
+
+# Libraries that must never be imported just by loading an entry point
+DEFERRED_PACKAGES = {
+    "langchain", "langchain_community", "chromadb", "sentence_transformers",
+    "torch", "transformers", "plotly", "streamlit",
+}
+
+
+def import_profile(module: str):
+    """Return (cumulative µs for module, {package: largest cumulative µs of its imports})"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, "src")]))
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stderr
+
+    total = 0
+    packages = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under the module that triggered them
+        top_level = not name[1:].startswith(" ")
+        name = name.strip()
+        package = name.split(".")[0]
+        packages[package] = max(packages[package], int(cumulative))
+        if top_level and name == module:
+            total = int(cumulative)
+    packages.pop(module, None)
+    return total, packages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every budget, e.g. on slow CI machines")
+    args = parser.parse_args()
+
+    failures = []
+    for module, budget_ms in BUDGETS_MS.items():
+        total, packages = import_profile(module)
+        budget_ms *= args.scale
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:5]
+        leaked = sorted(DEFERRED_PACKAGES & set(packages))
+
+        status = "✅" if total / 1000 <= budget_ms and not leaked else "❌"
+        print(f"{status} {module}: {total / 1000:.0f} ms (budget {budget_ms:.0f} ms)")
+        for name, cumulative in heaviest:
+            print(f"     {name:28} {cumulative / 1000:8.1f} ms")
+
+        if total / 1000 > budget_ms:
+            failures.append(f"{module} took {total / 1000:.0f} ms, budget {budget_ms:.0f} ms")
+        if leaked:
+            failures.append(f"{module} imports deferred packages at load time: {', '.join(leaked)}")
+
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
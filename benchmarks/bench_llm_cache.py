@@ -0,0 +1,69 @@
+"""
+Benchmark: LLM prompt cache and in-flight coalescing
+
+Uses the fake streaming LLM (per-word delay like a real model) behind
+``CachedLLM`` with a throwaway cache file, and reports:
+- a cold generation vs a repeat served from the cache
+- a repeat from a new process-like wrapper reading the same file
+- N concurrent identical prompts, and how many generations they cost
+
+Usage: python benchmarks/bench_llm_cache.py [concurrent callers] [delay per word in s]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from llm import ANSWER_PROMPT, FakeStreamingLLM
+from llm_cache import CachedLLM
+
+PROMPT = ANSWER_PROMPT.format(
+    question="How did Q1 go?",
+    facts="Q1 2023 Summary: Total Sales ₹1455000, Total Profit ₹455000, Avg Profit Margin 31.16%",
+)
+
+
+def timed_invoke(llm, prompt: str):
+    start = time.perf_counter()
+    answer = llm.invoke(prompt).content
+    return time.perf_counter() - start, answer
+
+
+if __name__ == "__main__":
+    callers = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm_cache.sqlite")
+        fake = FakeStreamingLLM(delay=delay)
+        llm = CachedLLM(fake, path)
+
+        cold, answer = timed_invoke(llm, PROMPT)
+        warm, cached_answer = timed_invoke(llm, PROMPT)
+        reopened, reopened_answer = timed_invoke(CachedLLM(FakeStreamingLLM(delay=delay), path), PROMPT)
+        print(f"Cold generation:        {cold * 1000:8.1f}ms")
+        print(f"Cached (same process):  {warm * 1000:8.2f}ms")
+        print(f"Cached (reopened file): {reopened * 1000:8.2f}ms")
+        print(f"Answers identical: {answer == cached_answer == reopened_answer}")
+
+        # Identical prompts arriving together, none of them cached yet
+        concurrent = CachedLLM(FakeStreamingLLM(delay=delay), os.path.join(tmp, "concurrent.sqlite"))
+        answers = []
+        barrier = threading.Barrier(callers)
+
+        def caller():
+            barrier.wait()
+            answers.append(concurrent.invoke(PROMPT).content)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=caller) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        print(f"\n{callers} concurrent identical prompts: {elapsed * 1000:.1f}ms, "
+              f"{concurrent.llm.calls} generation(s), all answers identical: {len(set(answers)) == 1}")
+        print(f"Stats: {concurrent.stats()}")
@@ -0,0 +1,79 @@
+"""
+Benchmark: bytes per row of the business DataFrame with and without the
+compact schema from data_loader.apply_schema
+
+Writes a synthetic CSV with the same columns as data/sme_data.csv (1M rows
+by default), loads it with pandas' inferred dtypes and with the compact
+schema, and reports the deep memory usage of both.
+
+Usage: python benchmarks/bench_memory_schema.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from data_loader import apply_schema
+
+
+def synthetic_csv(path: str, rows: int):
+    rng = np.random.default_rng(42)
+    names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    month_index = rng.integers(0, 12, rows)
+    years = rng.integers(2015, 2025, rows)
+    sales = rng.integers(100_000, 1_000_000, rows)
+    expenses = (sales * rng.uniform(0.5, 0.9, rows)).astype(int)
+    pd.DataFrame({
+        'Month': [f"{names[m]}-{y % 100:02d}" for m, y in zip(month_index, years)],
+        'Quarter': [f"Q{m // 3 + 1}" for m in month_index],
+        'Year': years,
+        'Sales (INR)': sales,
+        'Expenses (INR)': expenses,
+        'Profit (INR)': sales - expenses,
+        'Customers': rng.integers(50, 500, rows),
+        'New Customers': rng.integers(5, 80, rows),
+        'Inventory Cost (INR)': rng.integers(50_000, 150_000, rows),
+        'Marketing Spend (INR)': rng.integers(10_000, 70_000, rows),
+        'Employee Cost (INR)': rng.integers(80_000, 200_000, rows),
+        'Operational Cost (INR)': rng.integers(20_000, 90_000, rows),
+        'Revenue Growth (%)': rng.uniform(-10, 90, rows).round(1),
+        'Customer Retention (%)': rng.uniform(60, 99, rows).round(1),
+    }).to_csv(path, index=False)
+
+
+def bytes_per_row(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / len(df)
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.csv")
+        print(f"Writing {rows:,}-row synthetic CSV...")
+        synthetic_csv(path, rows)
+        inferred = pd.read_csv(path)
+
+    start = time.perf_counter()
+    compact = apply_schema(inferred)
+    elapsed = time.perf_counter() - start
+
+    before = inferred.memory_usage(deep=True)
+    after = compact.memory_usage(deep=True)
+    print(f"\n{'column':26} {'inferred':>14} {'compact':>14}")
+    for name in inferred.columns:
+        print(f"{name:26} {str(inferred[name].dtype):>8} {before[name] / rows:5.1f}B"
+              f" {str(compact[name].dtype):>8} {after[name] / rows:5.1f}B")
+
+    print(f"\nInferred dtypes: {bytes_per_row(inferred):8.1f} bytes/row")
+    print(f"Compact schema:  {bytes_per_row(compact):8.1f} bytes/row")
+    print(f"Reduction: {bytes_per_row(inferred) / bytes_per_row(compact):.1f}x "
+          f"(apply_schema took {elapsed:.2f} s)")
+
+    profit_before = (inferred['Sales (INR)'] - inferred['Expenses (INR)']).sum()
+    profit_after = (compact['Sales (INR)'] - compact['Expenses (INR)']).sum()
+    print(f"Totals identical: {profit_before == profit_after and inferred['Sales (INR)'].sum() == compact['Sales (INR)'].sum()}")
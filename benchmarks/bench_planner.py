@@ -0,0 +1,59 @@
+"""
+Benchmark: multi-part questions with their tool calls run sequentially vs
+concurrently on the agent's thread pool
+
+The pandas tools answer from the precomputed index in microseconds, so on
+their own they only lose to thread handoffs (which is why the agent uses
+the pool only for plans with a search); the pool pays off for calls that
+wait - the RAG search (when chromadb is installed) or a remote tool.
+``latency`` adds that much simulated waiting to every call to show the
+effect without those services.
+
+Usage: python benchmarks/bench_planner.py [latency in s] [repeats]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from agent import QUERY_ROUTER, SMEBusinessAgent
+from planner import plan, run_plan
+
+QUESTIONS = [
+    "Compare profit in May and June and suggest improvements for both",
+    "Profit for Jan, Feb and Mar and a summary of Q1",
+    "Summarize Q1, Q2, Q3 and Q4",
+]
+
+
+def timed(function, repeats: int) -> float:
+    """Median seconds per call"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.0
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    agent = SMEBusinessAgent()
+
+    def run(call):
+        if latency:
+            time.sleep(latency)
+        return agent._run_tool(call)
+
+    print(f"Simulated latency per call: {latency * 1000:.0f}ms\n")
+    print(f"{'question':52} {'calls':>5} {'sequential':>11} {'parallel':>10} {'speedup':>8}")
+    for question in QUESTIONS:
+        parsed = QUERY_ROUTER.parse(question, entities=agent.business_tools.index.entities)
+        calls = plan(question, parsed, agent._INTENT_TOOLS)
+        sequential = timed(lambda: run_plan(calls, run), repeats)
+        parallel = timed(lambda: run_plan(calls, run, agent.executor), repeats)
+        assert run_plan(calls, run) == run_plan(calls, run, agent.executor)
+        print(f"{question[:52]:52} {len(calls):5} {sequential * 1000:9.2f}ms {parallel * 1000:8.2f}ms "
+              f"{sequential / parallel:7.1f}x")
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark: per-query routing cost of the old keyword cascade vs QueryRouter
+
+The cascade stops at the first branch that matches, while the router also
+extracts the year and every intent, month and quarter. The router is timed
+as callers use it, ``QUERY_ROUTER.parse``; ``router_route`` only reshapes
+its result for the side-by-side table. The two are timed in alternating
+runs and each figure is the best of ``REPEATS``, as timings on a busy
+machine only ever err upwards.
+
+Usage: python benchmarks/bench_router.py [iterations]
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from sme_business_agent import QUERY_ROUTER
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+QUARTERS = ['q1', 'q2', 'q3', 'q4']
+REPEATS = 10
+
+QUESTIONS = [
+    "What was the profit in May 2023?",
+    "Summarize Q1 2023 performance",
+    "Suggest improvements for June",
+    "Which month had highest sales?",
+    "Give me business insights",
+    "How is customer retention trending?",
+    "What is our marketing cost per acquisition?",
+    "Tell me something interesting",
+]
+
+
+def legacy_route(query: str):
+    """The routing decisions of the original if/elif cascade, without the data work"""
+    query_lower = query.lower()
+    if 'profit' in query_lower:
+        if any(month in query_lower for month in MONTHS):
+            return 'profit', next(m for m in MONTHS if m in query_lower), None
+        elif any(quarter in query_lower for quarter in QUARTERS):
+            return 'profit', None, next(q.upper() for q in QUARTERS if q in query_lower)
+        return 'profit', None, None
+    elif 'sales' in query_lower or 'revenue' in query_lower:
+        return 'sales', None, None
+    elif 'customer' in query_lower:
+        return 'customers', None, None
+    elif 'expense' in query_lower or 'cost' in query_lower:
+        return 'expenses', None, None
+    elif any(quarter in query_lower for quarter in QUARTERS + ['quarter']):
+        if any(q in query_lower for q in QUARTERS):
+            return 'quarter', None, next(q.upper() for q in QUARTERS if q in query_lower)
+        return 'quarter', None, None
+    elif any(word in query_lower for word in ['growth', 'trend', 'increase', 'improvement']):
+        return 'growth', None, None
+    elif 'retention' in query_lower:
+        return 'retention', None, None
+    elif 'marketing' in query_lower or 'acquisition' in query_lower:
+        return 'marketing', None, None
+    elif any(word in query_lower for word in ['suggest', 'recommend', 'advice', 'improve', 'insight']):
+        return 'insights', None, None
+    elif any(word in query_lower for word in ['summary', 'overview', 'performance']):
+        return 'summary', None, None
+    return None, None, None
+
+
+def router_route(query: str):
+    parsed = QUERY_ROUTER.parse(query)
+    return (parsed.intents[0] if parsed.intents else None), parsed.month, parsed.quarter
+
+
+def bench(funcs, iterations: int) -> list:
+    """Return mean microseconds per question for each function, best of REPEATS alternating runs"""
+    best = [float('inf')] * len(funcs)
+    for _ in range(REPEATS):
+        for i, func in enumerate(funcs):
+            elapsed = timeit.timeit(lambda: [func(q) for q in QUESTIONS], number=iterations)
+            best[i] = min(best[i], elapsed)
+    return [elapsed / (iterations * len(QUESTIONS)) * 1e6 for elapsed in best]
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    print(f"{'question':45} {'legacy':>28} {'router':>28}")
+    for question in QUESTIONS:
+        print(f"{question:45} {str(legacy_route(question)):>28} {str(router_route(question)):>28}")
+
+    legacy, router = bench([legacy_route, QUERY_ROUTER.parse], iterations)
+    print(f"\nLegacy cascade: {legacy:.2f} µs/query")
+    print(f"QueryRouter:    {router:.2f} µs/query (also extracts year and all intents, "
+          f"{router / legacy:.2f}x the cascade)")
@@ -0,0 +1,89 @@
+"""
+Benchmark: hit rate and precision of the semantic answer cache by threshold
+
+Each group below holds rewordings of one question. The first wording of
+every group is cached; the others are looked up, and a hit is correct
+when it returns its own group's answer. Some groups differ from another
+only by period or only by metric ("sales in August" / "expenses in
+August"), the cases embeddings separate worst. Run with and without scope
+gating (the periods, year and entity the router extracts, plus its
+keywords when both questions have some, as the agent's semantic cache
+uses) to see how much of the precision comes from it. Needs
+sentence-transformers.
+
+Usage: python benchmarks/bench_semantic_cache.py
+"""
+import os
+import sys
+import time
+from importlib.util import find_spec
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from agent import QUERY_ROUTER
+from business_index import BusinessIndex
+from data_loader import load_business_data
+from response_cache import question_scope
+from semantic_cache import SemanticCache
+
+GROUPS = [
+    ["What was the profit in May?", "May profit", "how much did we make in May?", "profit for May 2023"],
+    ["What was the profit in June?", "June profit", "how much did we make in June?"],
+    ["Summarize Q1 performance", "How did the first quarter go?", "Q1 summary"],
+    ["Summarize Q2 performance", "How did the second quarter go?", "Q2 summary"],
+    ["What were the sales in August?", "August sales", "how much did we sell in August?"],
+    # Same period as a group above, different metric
+    ["What were the expenses in August?", "August expenses", "how much did we spend in August?"],
+    ["How many customers did we have in May?", "May customers", "customer count for May"],
+    ["What was the marketing spend in June?", "June marketing spend", "how much did we spend on marketing in June?"],
+    ["Which month had the highest sales?", "best month for sales", "top selling month"],
+    ["How can we reduce marketing costs?", "ways to cut marketing spend", "lower our marketing expenses"],
+    ["How many customers do we have?", "customer count", "number of customers"],
+]
+THRESHOLDS = [0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95]
+
+
+def evaluate(embeddings, scopes, threshold: float):
+    """(hit rate, precision) over all non-first wordings"""
+    cache = SemanticCache(threshold=threshold)
+    for group, (embedding, scope) in enumerate(zip(embeddings, scopes)):
+        cache.put(embedding[0], 1, str(group), *scope[0])
+    hits = correct = lookups = 0
+    for group, (embedding, scope) in enumerate(zip(embeddings, scopes)):
+        for vector, asked_scope in zip(embedding[1:], scope[1:]):
+            lookups += 1
+            answer = cache.get(vector, 1, *asked_scope)
+            if answer is not None:
+                hits += 1
+                correct += answer == str(group)
+    return hits / lookups, (correct / hits if hits else 1.0)
+
+
+if __name__ == "__main__":
+    if find_spec("sentence_transformers") is None:
+        print("❌ sentence-transformers is not installed")
+        sys.exit(1)
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    index = BusinessIndex(load_business_data(os.path.join(os.path.dirname(__file__), '..', 'data', 'sme_data.csv')))
+    start = time.perf_counter()
+    embeddings = [model.encode(group, convert_to_numpy=True) for group in GROUPS]
+    print(f"Embedded {sum(map(len, GROUPS))} questions in {time.perf_counter() - start:.2f}s\n")
+    parsed = [[QUERY_ROUTER.parse(question, index.entities) for question in group] for group in GROUPS]
+    scoped = [[(question_scope(query, index), None, query.keywords) for query in group] for group in parsed]
+    unscoped = [[(None,)] * len(group) for group in GROUPS]
+
+    print(f"{'threshold':>9} {'hit rate':>9} {'precision':>10} {'| unscoped hit rate':>19} {'precision':>10}")
+    for threshold in THRESHOLDS:
+        hit_rate, precision = evaluate(embeddings, scoped, threshold)
+        raw_hit_rate, raw_precision = evaluate(embeddings, unscoped, threshold)
+        print(f"{threshold:9.2f} {hit_rate:9.0%} {precision:10.0%} | {raw_hit_rate:17.0%} {raw_precision:10.0%}")
+
+    cache = SemanticCache()
+    for i in range(cache.maxsize):
+        cache.put(embeddings[i % len(embeddings)][0], 1, "answer", None)
+    start = time.perf_counter()
+    for _ in range(1000):
+        cache.get(embeddings[0][1], 1, None)
+    print(f"\nLookup over a full cache ({cache.maxsize} entries): "
+          f"{(time.perf_counter() - start) * 1000:.3f} ms per 1000 lookups")
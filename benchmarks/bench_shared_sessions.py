@@ -0,0 +1,84 @@
+"""
+Benchmark: resident memory of the Streamlit frontend's agent with 1, 10 and
+50 sessions, one agent per session (old) vs one agent shared by all
+
+Each scenario runs in a fresh interpreter. Sessions are simulated by
+creating the agent(s) - with the embedding model and vector store loaded
+when chromadb and sentence-transformers are installed - and then answering
+a query from every session on its own thread, as Streamlit does.
+
+Usage: python benchmarks/bench_shared_sessions.py [sessions ...]
+"""
+import json
+import os
+import subprocess
+import sys
+from importlib.util import find_spec
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SCRIPT = """
+import json, sys, threading
+sys.path.append('src')
+from agent import SMEBusinessAgent
+
+def rss_mb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+
+def new_agent():
+    agent = SMEBusinessAgent()
+    if {with_rag}:
+        agent.warm_up(background=False)
+    return agent
+
+baseline = rss_mb()
+if {shared}:
+    agent = new_agent()
+    agents = [agent] * {sessions}
+else:
+    agents = [new_agent() for _ in range({sessions})]
+
+errors = []
+def session(agent):
+    try:
+        agent.simple_query("What was the profit in May 2023?")
+        if {with_rag}:
+            agent.rag_pipeline.query("marketing spend", n_results=3)
+    except Exception as e:
+        errors.append(repr(e))
+
+threads = [threading.Thread(target=session, args=(agent,)) for agent in agents]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(json.dumps({{"baseline": baseline, "rss": rss_mb(), "errors": errors}}))
+"""
+
+
+def run(sessions: int, shared: bool, with_rag: bool) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(sessions=sessions, shared=shared, with_rag=with_rag)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 10, 50]
+    with_rag = find_spec("chromadb") is not None and find_spec("sentence_transformers") is not None
+    if not with_rag:
+        print("⚠️ chromadb/sentence-transformers not installed - measuring the pandas tools only\n")
+
+    print(f"{'sessions':>8} {'per session':>12} {'shared':>10} {'saved':>10}")
+    for sessions in counts:
+        separate = run(sessions, shared=False, with_rag=with_rag)
+        shared = run(sessions, shared=True, with_rag=with_rag)
+        for result in (separate, shared):
+            if result["errors"]:
+                print(f"❌ {len(result['errors'])} session queries failed: {result['errors'][0]}")
+        print(f"{sessions:8} {separate['rss']:10.0f}MB {shared['rss']:8.0f}MB "
+              f"{separate['rss'] - shared['rss']:8.0f}MB")
@@ -0,0 +1,84 @@
+"""
+Benchmark: time to first token vs time to full answer on the web
+interface's streaming endpoint
+
+Serves web_interface on a free local port with the fake LLM
+(SME_LLM=fake), which streams words with a fixed per-word delay like a
+real model, and times /stream (first event and last event) against the
+tool-only /ask answer.
+
+Usage: python benchmarks/bench_streaming.py [requests] [delay per word in s]
+"""
+import http.client
+import os
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+os.environ["SME_LLM"] = "fake"
+# Every request should generate, not replay the prompt cache
+os.environ["SME_LLM_CACHE"] = ""
+os.environ.setdefault("SME_FAKE_LLM_DELAY", sys.argv[2] if len(sys.argv) > 2 else "0.03")
+sys.path.append(ROOT)
+os.chdir(ROOT)
+from web_interface import PooledHTTPServer, SMEHandler, get_agent
+
+QUESTIONS = [
+    "What was the profit in May 2023?",
+    "Summarize Q1 2023 performance",
+    "give me business insights",
+]
+
+
+class QuietHandler(SMEHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def timed_stream(port: int, question: str):
+    """(seconds to first event, seconds to last event, answer)"""
+    connection = http.client.HTTPConnection("localhost", port)
+    start = time.perf_counter()
+    connection.request("GET", "/stream?q=" + quote(question))
+    response = connection.getresponse()
+    first = None
+    pieces = []
+    for line in response:
+        if line.startswith(b"data: ") and line.strip() != b"data:":
+            first = first or time.perf_counter() - start
+            pieces.append(line[6:].decode())
+    total = time.perf_counter() - start
+    connection.close()
+    return first, total, len(pieces)
+
+
+def timed_ask(port: int, question: str) -> float:
+    connection = http.client.HTTPConnection("localhost", port)
+    start = time.perf_counter()
+    connection.request("GET", "/ask?q=" + quote(question))
+    connection.getresponse().read()
+    connection.close()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    get_agent()
+    server = PooledHTTPServer(("localhost", 0), QuietHandler, workers=4, max_pending=8)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"Fake LLM delay: {os.environ['SME_FAKE_LLM_DELAY']}s per word, {requests} requests per question\n")
+    print(f"{'question':36} {'/ask':>8} {'first token':>12} {'full stream':>12} {'events':>7}")
+    for question in QUESTIONS:
+        asks = [timed_ask(port, question) for _ in range(requests)]
+        streams = [timed_stream(port, question) for _ in range(requests)]
+        first = statistics.median(result[0] for result in streams)
+        total = statistics.median(result[1] for result in streams)
+        print(f"{question[:36]:36} {statistics.median(asks) * 1000:6.1f}ms {first * 1000:10.1f}ms "
+              f"{total * 1000:10.1f}ms {streams[0][2]:7}")
+    server.shutdown()
+    server.server_close()
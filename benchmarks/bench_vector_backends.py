@@ -0,0 +1,116 @@
+"""
+Benchmark: ChromaDB vs the in-process NumPy vector index
+
+For each backend and store size, a fresh interpreter builds a persisted
+store from random 384-dimension embeddings (the size all-MiniLM-L6-v2
+produces) in batches of 256, as ``SMERAGPipeline`` does, then reopens it
+and times single queries, unfiltered and filtered to one month of one
+year as ``SMERAGPipeline.query`` does for "profit in May 2023" (records
+are spread over twelve months of ten years). Reported: build time,
+reopen time, median and p95 query latency, median filtered latency, and
+resident memory added by the import, build and reopened store. Backends
+whose packages aren't installed are skipped.
+
+The NumPy results are also checked against a brute-force search.
+
+Usage: python benchmarks/bench_vector_backends.py [records ...]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from importlib.util import find_spec
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from vector_store import BACKEND_PACKAGES
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SCRIPT = """
+import json, shutil, sys, time
+sys.path.append('src')
+import numpy as np
+
+def rss_mb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+
+rng = np.random.default_rng(0)
+embeddings = rng.standard_normal(({records}, 384), dtype=np.float32)
+queries = rng.standard_normal((200, 384), dtype=np.float32)
+ids = [f"record_{{i}}" for i in range({records})]
+baseline = rss_mb()
+
+start = time.perf_counter()
+from vector_store import create_backend
+store = create_backend({backend!r}, {directory!r})
+for begin in range(0, {records}, 256):
+    rows = range(begin, min(begin + 256, {records}))
+    store.upsert(ids[begin:rows.stop], embeddings[begin:rows.stop], [f"document {{i}}" for i in rows],
+                 [{{"row": i, "period_year": 2015 + i // 12 % 10, "period_month": i % 12 + 1}} for i in rows])
+store.flush()
+build = time.perf_counter() - start
+del store
+
+start = time.perf_counter()
+store = create_backend({backend!r}, {directory!r})
+reopen = time.perf_counter() - start
+
+store.query([queries[0]], 5)
+latencies = []
+for query in queries:
+    start = time.perf_counter()
+    results = store.query([query], 5)
+    latencies.append(time.perf_counter() - start)
+
+where = {{"$and": [{{"period_month": {{"$in": [5]}}}}, {{"period_year": 2023}}]}}
+store.query([queries[0]], 5, where=where)
+filtered = []
+for query in queries:
+    start = time.perf_counter()
+    store.query([query], 5, where=where)
+    filtered.append(time.perf_counter() - start)
+
+correct = None
+if {backend!r} == "numpy":
+    units = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    correct = all(
+        store.query([query], 5)["ids"][0] == [ids[i] for i in np.argsort(-(units @ query), kind="stable")[:5]]
+        for query in queries[:20]
+    )
+print(json.dumps({{"build": build, "reopen": reopen,
+                  "p50": float(np.percentile(latencies, 50)), "p95": float(np.percentile(latencies, 95)),
+                  "filtered": float(np.percentile(filtered, 50)),
+                  "rss": rss_mb() - baseline, "correct": correct}}))
+"""
+
+
+def run(backend: str, records: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(backend=backend, records=records, directory=directory)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+
+    print(f"{'backend':>8} {'records':>8} {'build':>9} {'reopen':>9} {'p50':>9} {'p95':>9} "
+          f"{'filtered':>9} {'memory':>9}")
+    for backend, packages in BACKEND_PACKAGES.items():
+        missing = [package for package in packages if find_spec(package) is None]
+        if missing:
+            print(f"{backend:>8}  skipped - {', '.join(missing)} not installed")
+            continue
+        for records in sizes:
+            result = run(backend, records)
+            print(f"{backend:>8} {records:>8} {result['build']:>8.2f}s {result['reopen'] * 1000:>7.1f}ms "
+                  f"{result['p50'] * 1000:>7.2f}ms {result['p95'] * 1000:>7.2f}ms "
+                  f"{result['filtered'] * 1000:>7.2f}ms {result['rss']:>7.1f}MB")
+            if result['correct'] is False:
+                print("❌ NumPy results differ from a brute-force search")
@@ -3,8 +3,6 @@ Simple Streamlit Business Dashboard - Lightweight version
 """
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from sme_business_agent import SimpleBusinessAgent
 import os
 
@@ -53,7 +51,10 @@ st.markdown("""
 # Initialize the simple agent
 @st.cache_resource
 def load_agent():
-    return SimpleBusinessAgent()
+    agent = SimpleBusinessAgent()
+    # Swap in CSV changes in the background; each rerun reads the latest data
+    agent.start_watching()
+    return agent
 
 def main():
     # Header
@@ -133,6 +134,9 @@ def show_dashboard(agent):
 
 def show_analytics(agent):
     """Show detailed analytics and charts"""
+    # Plotly is only needed for this tab, so don't pay for it at startup
+    import plotly.express as px
+    
     st.subheader("📈 Business Analytics")
     
     df = agent.df.copy()
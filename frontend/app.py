@@ -1,9 +1,6 @@
 import streamlit as st
 import sys
 import os
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -51,33 +48,28 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
-if 'agent' not in st.session_state:
-    with st.spinner("Initializing AI Agent..."):
-        st.session_state.agent = SMEBusinessAgent()
+# One agent - and one embedding model and vector store - for the whole
+# process, shared by every browser session. Queries only read immutable
+# data snapshots and the model call is serialized, so sessions can use it
+# concurrently.
+@st.cache_resource
+def load_agent() -> SMEBusinessAgent:
+    agent = SMEBusinessAgent()
+    # Load the search index in the background; tool-based answers don't need it
+    agent.warm_up()
+    agent.start_watching()
+    return agent
+
+with st.spinner("Initializing AI Agent..."):
+    agent = load_agent()
+
+# Chat history stays per session
 
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 
-# Load business data
-@st.cache_data
-def load_business_data():
-    try:
-        df = pd.read_csv('../data/sme_data.csv')
-    except FileNotFoundError:
-        # Sample data if file not found
-        df = pd.DataFrame({
-            'Month': ['Jan-23', 'Feb-23', 'Mar-23', 'Apr-23', 'May-23', 'Jun-23'],
-            'Sales (INR)': [500000, 480000, 520000, 600000, 550000, 450000],
-            'Expenses (INR)': [300000, 320000, 310000, 340000, 330000, 360000],
-            'Customers': [200, 190, 210, 250, 230, 180],
-            'Inventory Cost (INR)': [120000, 130000, 125000, 140000, 135000, 145000],
-            'Marketing Spend (INR)': [30000, 28000, 35000, 40000, 37000, 25000]
-        })
-    df['Profit'] = df['Sales (INR)'] - df['Expenses (INR)']
-    return df
-
-df = load_business_data()
+# Business data from the agent's current snapshot, so charts follow CSV changes
+df = agent.business_tools.df
 
 # Header
 st.markdown("""
@@ -107,19 +99,19 @@ with st.sidebar:
     
     if st.button("� Profit Summary", use_container_width=True):
         st.session_state.chat_history.append(("You", "Show me profit analysis"))
-        response = st.session_state.agent.simple_query("Show me profit for all months")
+        response = agent.simple_query("Show me profit for all months")
         st.session_state.chat_history.append(("AI", response))
         st.rerun()
     
     if st.button("📊 Q1 Performance", use_container_width=True):
         st.session_state.chat_history.append(("You", "Q1 2023 summary"))
-        response = st.session_state.agent.simple_query("Summarize Q1 2023 performance")
+        response = agent.simple_query("Summarize Q1 2023 performance")
         st.session_state.chat_history.append(("AI", response))
         st.rerun()
     
     if st.button("💡 Recommendations", use_container_width=True):
         st.session_state.chat_history.append(("You", "Business suggestions"))
-        response = st.session_state.agent.simple_query("Suggest business improvements")
+        response = agent.simple_query("Suggest business improvements")
         st.session_state.chat_history.append(("AI", response))
         st.rerun()
 
@@ -145,15 +137,19 @@ with col1:
     
     if user_input:
         st.session_state.chat_history.append(("You", user_input))
+        st.chat_message("user").write(user_input)
         
-        with st.spinner("Analyzing..."):
-            response = st.session_state.agent.simple_query(user_input)
-            st.session_state.chat_history.append(("AI", response))
+        # Render the answer as the LLM generates it
+        with st.chat_message("assistant"):
+            response = st.write_stream(agent.stream_query(user_input))
+        st.session_state.chat_history.append(("AI", response))
         
         st.rerun()
 
 with col2:
-    # Charts
+    # Charts; plotly is imported here, on the only path that draws them
+    import plotly.express as px
+    
     st.subheader("� Data Visualizations")
     
     # Sales trend
@@ -179,21 +175,21 @@ col1, col2, col3 = st.columns(3)
 with col1:
     if st.button("What was the profit in May 2023?"):
         st.session_state.chat_history.append(("You", "What was the profit in May 2023?"))
-        response = st.session_state.agent.simple_query("What was the profit in May 2023?")
+        response = agent.simple_query("What was the profit in May 2023?")
         st.session_state.chat_history.append(("AI", response))
         st.rerun()
 
 with col2:
     if st.button("Which month had highest sales?"):
         st.session_state.chat_history.append(("You", "Which month had highest sales?"))
-        response = st.session_state.agent.simple_query("Which month had highest sales?")
+        response = agent.simple_query("Which month had highest sales?")
         st.session_state.chat_history.append(("AI", response))
         st.rerun()
 
 with col3:
     if st.button("Give me cost reduction tips"):
         st.session_state.chat_history.append(("You", "Cost reduction strategies"))
-        response = st.session_state.agent.simple_query("Suggest cost reduction strategies")
+        response = agent.simple_query("Suggest cost reduction strategies")
         st.session_state.chat_history.append(("AI", response))
         st.rerun()
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Append new business rows to the dataset without rebuilding it
+
+The rows are appended to the CSV (extending the columnar cache). Running
+interfaces pick them up on their next reload check and embed just the
+new rows into their vector store; one started later does so when it
+syncs on startup.
+
+``--embed`` embeds the new rows into the persisted vector store right
+away instead. Use it only while no interface is running: ChromaDB
+doesn't support two processes writing the same store.
+
+Usage:
+    python ingest.py new_rows.csv
+    python ingest.py new_rows.json
+    python ingest.py --row Month=Jan-24 Year=2024 "Sales (INR)=870000" "Expenses (INR)=530000" \
+        Customers=340 "Inventory Cost (INR)=120000" "Marketing Spend (INR)=58000"
+"""
+import argparse
+import os
+import sys
+from importlib.util import find_spec
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from data_loader import append_business_rows, load_business_data, resolve_data_path
+from vector_store import BACKEND_PACKAGES, VECTOR_BACKEND
+
+
+def read_rows(paths, row_values) -> pd.DataFrame:
+    """Rows from CSV/JSON files plus one row given as Column=value pairs"""
+    frames = []
+    for path in paths:
+        if path.lower().endswith('.json'):
+            frames.append(pd.read_json(path, orient='records'))
+        else:
+            frames.append(pd.read_csv(path))
+    if row_values:
+        row = {}
+        for pair in row_values:
+            column, separator, value = pair.partition('=')
+            if not separator:
+                raise ValueError(f"Expected Column=value, got: {pair}")
+            row[column.strip()] = value.strip()
+        frames.append(pd.DataFrame([row]))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append rows to the SME business dataset")
+    parser.add_argument("files", nargs="*", help="CSV or JSON (list of records) files with new rows")
+    parser.add_argument("--row", nargs="+", metavar="COLUMN=VALUE", help="a single row given inline")
+    parser.add_argument("--data", default="data/sme_data.csv", help="dataset CSV to append to")
+    parser.add_argument("--embed", action="store_true",
+                        help="embed the new rows into the vector store now (only while no interface is running)")
+    args = parser.parse_args()
+
+    try:
+        rows = read_rows(args.files, args.row)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read rows: {e}")
+        return 1
+    if rows.empty:
+        parser.error("no rows given - pass files or --row")
+
+    data_path = resolve_data_path(args.data)
+    if not os.path.exists(data_path):
+        print(f"❌ Data file not found: {data_path}")
+        return 1
+    start = len(load_business_data(data_path))
+
+    pipeline = previous_signature = None
+    if args.embed:
+        required = ["sentence_transformers"] + BACKEND_PACKAGES.get(VECTOR_BACKEND, [])
+        missing = [package for package in required if find_spec(package) is None]
+        if missing:
+            print(f"⚠️ {', '.join(missing)} not installed, skipping the vector store")
+        else:
+            from rag_pipeline import SMERAGPipeline
+            pipeline = SMERAGPipeline(data_path)
+            previous_signature = pipeline.source_signature()
+            # Load the embedding model before touching the CSV, so a failure
+            # can't leave rows in the file that the store never gets
+            pipeline.model
+
+    try:
+        appended = append_business_rows(data_path, rows)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ Appended {len(appended)} rows to {data_path} ({start + len(appended)} total)")
+
+    if pipeline is not None:
+        pipeline.add_rows(appended, start, previous_signature)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
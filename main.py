@@ -16,8 +16,9 @@ def main():
     print("\nType 'quit' to exit")
     print("="*50)
     
-    # Initialize agent
+    # Initialize agent; the search index loads in the background while the user types
     agent = SMEBusinessAgent()
+    agent.warm_up()
     
     while True:
         user_input = input("\n💼 Your question: ").strip()
@@ -6,6 +6,7 @@ SME Business AI Agent - Main Application Launcher
 import sys
 import os
 import subprocess
+from importlib.util import find_spec
 from pathlib import Path
 
 def main():
@@ -32,12 +33,15 @@ def main():
                 
             elif choice == "2":
                 print("\n🚀 Starting Simple Web Interface...")
-                subprocess.run([sys.executable, "web_interface.py"])
+                # Run in this interpreter instead of paying for a second cold start
+                from web_interface import run_simple_server
+                run_simple_server()
                 break
                 
             elif choice == "3":
                 print("\n🚀 Starting Command Line Interface...")
-                subprocess.run([sys.executable, "sme_business_agent.py"])
+                from sme_business_agent import run_cli
+                run_cli()
                 break
                 
             elif choice == "4":
@@ -75,10 +79,10 @@ def show_system_info():
     
     print("\n📦 Dependencies:")
     for package, description in dependencies:
-        try:
-            __import__(package)
+        # find_spec checks availability without paying for the import
+        if find_spec(package) is not None:
             print(f"  ✅ {package} - {description}")
-        except ImportError:
+        else:
             print(f"  ❌ {package} - {description} (not installed)")
     
     # Project structure
@@ -3,20 +3,128 @@ Simple Business AI Agent - Lightweight version without heavy ML dependencies
 """
 import pandas as pd
 import os
+import sys
 import json
-from typing import Dict, Any, List
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+from query_router import ParsedQuery, QueryRouter
+from business_index import BusinessIndex, entity_column
+from business_stats import DatasetStats
+from data_loader import append_business_rows, load_business_data
+from data_watcher import DatasetWatcher
+from dataset import BusinessDataset
+from response_cache import ResponseCache, response_key
+from llm import create_llm, stream_answer
+
+# Intents in priority order; a question is answered by the first that applies
+QUERY_ROUTER = QueryRouter(
+    rules=[
+        ('profit', ['profit']),
+        ('sales', ['sales', 'revenue']),
+        ('customers', ['customer']),
+        ('expenses', ['expense', 'cost']),
+        ('quarter', ['quarter']),
+        ('growth', ['growth', 'trend', 'increase', 'improvement']),
+        ('retention', ['retention']),
+        ('marketing', ['marketing', 'acquisition']),
+        ('insights', ['suggest', 'recommend', 'advice', 'improve', 'insight']),
+        ('summary', ['summary', 'overview', 'performance']),
+    ],
+    modifiers=['highest', 'best', 'maximum', 'total'],
+)
+
+HELP_TEXT = """
+I can help you analyze your business data. Try asking:
+• "What was the profit in May?"
+• "Which month had highest sales?"
+• "Give me business insights"
+• "Show performance summary"
+• "What are total expenses?"
+• "How many customers on average?"
+""".strip()
 
 class SimpleBusinessAgent:
     def __init__(self):
         self.data_file = os.path.join("data", "sme_data.csv")
-        self.df = None
+        self._dataset = None
+        # Each query pins the snapshot it started with, so a reload that
+        # lands mid-query can't mix two versions of the data
+        self._pinned = threading.local()
+        self._watcher = DatasetWatcher(self.data_file, self._apply_appended, self._reload)
+        self.responses = ResponseCache()
+        self._llm = None
+        self._llm_loaded = False
+        self._llm_lock = threading.Lock()
         self.load_data()
     
+    @property
+    def dataset(self) -> Optional[BusinessDataset]:
+        pinned = getattr(self._pinned, 'dataset', None)
+        return pinned if pinned is not None else self._dataset
+    
+    @property
+    def df(self) -> Optional[pd.DataFrame]:
+        dataset = self.dataset
+        return None if dataset is None else dataset.df
+    
+    @property
+    def stats(self) -> Optional[DatasetStats]:
+        dataset = self.dataset
+        return None if dataset is None else dataset.stats
+    
+    @property
+    def index(self) -> Optional[BusinessIndex]:
+        dataset = self.dataset
+        return None if dataset is None else dataset.index
+    
+    @property
+    def llm(self):
+        """Chat model used by ``stream_query``, created on first use (None if unavailable)"""
+        if not self._llm_loaded:
+            with self._llm_lock:
+                if not self._llm_loaded:
+                    try:
+                        self._llm = create_llm()
+                    except Exception as e:
+                        print(f"⚠️ LLM not available ({e}), answering from the data only")
+                    self._llm_loaded = True
+        return self._llm
+    
+    @contextmanager
+    def _pin(self):
+        """Serve everything inside the block from one snapshot"""
+        if getattr(self._pinned, 'dataset', None) is not None:
+            yield
+            return
+        self._pinned.dataset = self._dataset
+        try:
+            yield
+        finally:
+            self._pinned.dataset = None
+    
+    def _set_frame(self, df: pd.DataFrame):
+        """Swap in a newly loaded frame together with fresh statistics and index"""
+        self._dataset = BusinessDataset(df)
+    
+    def _apply_appended(self, rows: pd.DataFrame):
+        # Built off to the side, then published with a single assignment
+        self._dataset = self._dataset.append(rows)
+        print(f"🔄 Added {len(rows)} appended rows ({len(self._dataset)} total)")
+    
+    def _reload(self):
+        self._set_frame(load_business_data(self.data_file))
+        print(f"🔄 Reloaded {len(self._dataset)} rows of business data")
+    
     def load_data(self):
         """Load the business data"""
         try:
             if os.path.exists(self.data_file):
-                self.df = pd.read_csv(self.data_file)
+                signature = self._watcher.signature()
+                self._set_frame(load_business_data(self.data_file))
+                self._watcher.mark_loaded(signature)
                 print(f"✅ Loaded {len(self.df)} rows of business data")
             else:
                 print(f"⚠️ Data file not found: {self.data_file}")
@@ -43,32 +151,73 @@ class SimpleBusinessAgent:
             'Revenue Growth (%)': [0.0, 7.8, 15.6, 28.9, 38.9, 32.2, 51.1, 58.9, 54.4, 60.0, 70.0, 88.9],
             'Customer Retention (%)': [85.5, 87.2, 88.1, 89.4, 90.2, 89.5, 91.3, 92.1, 91.8, 93.2, 94.1, 95.5]
         }
-        self.df = pd.DataFrame(sample_data)
+        self._set_frame(pd.DataFrame(sample_data))
         
         # Create data directory if it doesn't exist
         os.makedirs("data", exist_ok=True)
         self.df.to_csv(self.data_file, index=False)
+        self._watcher.mark_loaded()
         print(f"✅ Created comprehensive sample data with {len(self.df)} rows")
     
-    def get_monthly_summary(self, month: str = None) -> Dict[str, Any]:
-        """Get summary for a specific month or all months"""
+    def reload_if_changed(self) -> bool:
+        """Reload the data now if the CSV changed on disk since it was last loaded
+        
+        When the file only grew, just the appended rows are read and folded
+        into the current dataset. Long-running servers call ``start_watching``
+        instead of checking on every request.
+        """
+        return self._watcher.check()
+    
+    def start_watching(self, interval: Optional[float] = None) -> DatasetWatcher:
+        """Pick up changes to the CSV in the background, without blocking queries"""
+        if interval is not None:
+            self._watcher.interval = interval
+        return self._watcher.start()
+    
+    def append_rows(self, rows: pd.DataFrame) -> int:
+        """Append new rows to the data file and the loaded data; returns the new dataset version
+        
+        Raises ``ValueError`` if the rows don't fit the data file's columns.
+        """
+        with self._watcher.lock:
+            # Pick up other writers' changes first so the appended rows land after them
+            self._watcher.check()
+            appended = append_business_rows(self.data_file, rows)
+            self._dataset = self._dataset.append(appended)
+            self._watcher.mark_loaded()
+        return self._dataset.version
+    
+    def get_monthly_summary(self, month: str = None, year: Optional[int] = None,
+                            entity: Optional[str] = None) -> Dict[str, Any]:
+        """Get summary for a specific month (latest year, all branches by default) or all months"""
+        with self._pin():
+            return self._monthly_summary(month, year, entity)
+    
+    def _monthly_summary(self, month: Optional[str], year: Optional[int], entity: Optional[str]) -> Dict[str, Any]:
         if self.df is None:
             return {"error": "No data available"}
         
         if month:
-            month_data = self.df[self.df['Month'].str.contains(month, case=False)]
-            if month_data.empty:
+            totals = self.index.month(month, year, entity)
+            if totals is None:
                 return {"error": f"No data found for month: {month}"}
-            data = month_data.iloc[0].to_dict()
+            if totals['count'] == 1:
+                data = self.df.iloc[self.index.month_position(month, year, entity)].to_dict()
+            else:
+                # Several branches in the month: sum amounts, average percentages
+                count = totals.pop('count')
+                data = {column: value / count if column.endswith('(%)') else value
+                        for column, value in totals.items()}
         else:
             # Overall summary
+            stats = self.stats
             data = {
-                'Total_Sales': self.df['Sales (INR)'].sum(),
-                'Total_Expenses': self.df['Expenses (INR)'].sum(),
-                'Total_Profit': self.df['Sales (INR)'].sum() - self.df['Expenses (INR)'].sum(),
-                'Avg_Customers': self.df['Customers'].mean(),
-                'Best_Month': self.df.loc[self.df['Sales (INR)'].idxmax(), 'Month'],
-                'Worst_Month': self.df.loc[self.df['Sales (INR)'].idxmin(), 'Month']
+                'Total_Sales': stats.total_sales,
+                'Total_Expenses': stats.total_expenses,
+                'Total_Profit': stats.total_sales - stats.total_expenses,
+                'Avg_Customers': stats.avg_customers,
+                'Best_Month': stats.best_month,
+                'Worst_Month': stats.worst_month
             }
         
         return data
@@ -78,20 +227,23 @@ class SimpleBusinessAgent:
         if self.df is None:
             return ["No data available for analysis"]
         
+        # Computed once per loaded dataset
+        stats = self.stats
+        return list(stats.memoize('insights', lambda: self._compute_insights(stats)))
+    
+    def _compute_insights(self, stats: DatasetStats) -> List[str]:
         insights = []
+        df = stats.df
         
-        # Calculate profit if not already present
-        if 'Profit (INR)' not in self.df.columns:
-            self.df['Profit (INR)'] = self.df['Sales (INR)'] - self.df['Expenses (INR)']
-        
-        # Revenue growth analysis
-        if 'Revenue Growth (%)' in self.df.columns:
-            final_growth = self.df['Revenue Growth (%)'].iloc[-1]
+        # Revenue growth analysis; appended rows may leave the percentages out
+        growth = df['Revenue Growth (%)'].dropna() if 'Revenue Growth (%)' in df.columns else ()
+        if len(growth):
+            final_growth = growth.iloc[-1]
             insights.append(f"📈 Excellent revenue growth of {final_growth:.1f}% over the year")
         
         # Profitability analysis
-        avg_profit = self.df['Profit (INR)'].mean()
-        profit_margin = (avg_profit / self.df['Sales (INR)'].mean()) * 100
+        avg_profit = stats.avg_profit
+        profit_margin = (avg_profit / stats.avg_sales) * 100
         
         if avg_profit > 0:
             insights.append(f"✅ Strong profitability with {profit_margin:.1f}% average profit margin")
@@ -99,26 +251,26 @@ class SimpleBusinessAgent:
             insights.append(f"⚠️ Loss-making business - immediate action needed")
         
         # Customer retention analysis
-        if 'Customer Retention (%)' in self.df.columns:
-            avg_retention = self.df['Customer Retention (%)'].mean()
-            final_retention = self.df['Customer Retention (%)'].iloc[-1]
+        retention = df['Customer Retention (%)'].dropna() if 'Customer Retention (%)' in df.columns else ()
+        if len(retention):
+            final_retention = retention.iloc[-1]
             insights.append(f"� Excellent customer loyalty - {final_retention:.1f}% retention rate")
         
         # Quarterly performance
-        if 'Quarter' in self.df.columns:
-            quarterly_sales = self.df.groupby('Quarter')['Sales (INR)'].sum()
+        if 'Quarter' in df.columns:
+            quarterly_sales = stats.quarterly_sales
             best_quarter = quarterly_sales.idxmax()
             insights.append(f"🏆 {best_quarter} was the strongest quarter with ₹{quarterly_sales[best_quarter]:,} in sales")
         
         # Marketing efficiency
-        if 'Marketing Spend (INR)' in self.df.columns and 'New Customers' in self.df.columns:
-            total_marketing = self.df['Marketing Spend (INR)'].sum()
-            total_new_customers = self.df['New Customers'].sum()
+        if 'Marketing Spend (INR)' in df.columns and 'New Customers' in df.columns:
+            total_marketing = stats.total_marketing
+            total_new_customers = stats.total_new_customers
             cost_per_acquisition = total_marketing / total_new_customers if total_new_customers > 0 else 0
             insights.append(f"� Customer acquisition cost: ₹{cost_per_acquisition:,.0f} per new customer")
         
         # Seasonal patterns
-        sales_growth = ((self.df['Sales (INR)'].iloc[-1] - self.df['Sales (INR)'].iloc[0]) / self.df['Sales (INR)'].iloc[0]) * 100
+        sales_growth = ((df['Sales (INR)'].iloc[-1] - df['Sales (INR)'].iloc[0]) / df['Sales (INR)'].iloc[0]) * 100
         if sales_growth > 50:
             insights.append("� Exceptional business growth - consider scaling operations")
         elif sales_growth > 20:
@@ -126,119 +278,138 @@ class SimpleBusinessAgent:
         
         return insights
     
-    def simple_query(self, query: str) -> str:
-        """Handle simple queries about the business"""
-        if self.df is None:
-            return "❌ No data available. Please load business data first."
-        
-        query_lower = query.lower()
-        
-        # Profit queries
-        if 'profit' in query_lower:
-            if any(month in query_lower for month in ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']):
-                month = next(m for m in ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'] if m in query_lower)
-                month_data = self.get_monthly_summary(month)
-                if 'error' not in month_data:
-                    if 'Profit (INR)' in month_data:
-                        return f"Profit for {month_data['Month']}: ₹{month_data['Profit (INR)']:,}"
-                    else:
-                        profit = month_data['Sales (INR)'] - month_data['Expenses (INR)']
-                        return f"Profit for {month_data['Month']}: ₹{profit:,}"
-            elif any(quarter in query_lower for quarter in ['q1', 'q2', 'q3', 'q4']):
-                quarter = next(q.upper() for q in ['q1', 'q2', 'q3', 'q4'] if q in query_lower)
-                if 'Quarter' in self.df.columns:
-                    quarter_data = self.df[self.df['Quarter'] == quarter]
-                    total_profit = quarter_data['Profit (INR)'].sum() if 'Profit (INR)' in self.df.columns else (quarter_data['Sales (INR)'].sum() - quarter_data['Expenses (INR)'].sum())
-                    return f"Total profit for {quarter}: ₹{total_profit:,}"
-            else:
-                if 'Profit (INR)' in self.df.columns:
-                    total_profit = self.df['Profit (INR)'].sum()
-                else:
-                    total_profit = self.df['Sales (INR)'].sum() - self.df['Expenses (INR)'].sum()
-                return f"Total profit across all months: ₹{total_profit:,}"
-        
-        # Sales queries
-        elif 'sales' in query_lower or 'revenue' in query_lower:
-            if 'highest' in query_lower or 'best' in query_lower or 'maximum' in query_lower:
-                summary = self.get_monthly_summary()
-                best_month = summary['Best_Month']
-                best_sales = self.df[self.df['Month'] == best_month]['Sales (INR)'].iloc[0]
-                return f"Highest sales: ₹{best_sales:,} in {best_month}"
-            elif 'total' in query_lower:
-                summary = self.get_monthly_summary()
-                return f"Total sales: ₹{summary['Total_Sales']:,}"
-            else:
-                return f"Average monthly sales: ₹{self.df['Sales (INR)'].mean():,.0f}"
-        
-        # Customer queries
-        elif 'customer' in query_lower:
-            avg_customers = self.df['Customers'].mean()
-            return f"Average customers per month: {avg_customers:.0f}"
-        
-        # Expense queries
-        elif 'expense' in query_lower or 'cost' in query_lower:
-            if 'total' in query_lower:
-                summary = self.get_monthly_summary()
-                return f"Total expenses: ₹{summary['Total_Expenses']:,}"
-            else:
-                return f"Average monthly expenses: ₹{self.df['Expenses (INR)'].mean():,.0f}"
-        
-        # Quarter analysis
-        elif any(quarter in query_lower for quarter in ['q1', 'q2', 'q3', 'q4', 'quarter']):
-            if 'Quarter' in self.df.columns:
-                if any(q in query_lower for q in ['q1', 'q2', 'q3', 'q4']):
-                    quarter = next(q.upper() for q in ['q1', 'q2', 'q3', 'q4'] if q in query_lower)
-                    quarter_data = self.df[self.df['Quarter'] == quarter]
-                    total_sales = quarter_data['Sales (INR)'].sum()
-                    total_profit = quarter_data['Profit (INR)'].sum() if 'Profit (INR)' in self.df.columns else (quarter_data['Sales (INR)'].sum() - quarter_data['Expenses (INR)'].sum())
-                    avg_customers = quarter_data['Customers'].mean()
-                    return f"{quarter} Performance:\n• Sales: ₹{total_sales:,}\n• Profit: ₹{total_profit:,}\n• Avg Customers: {avg_customers:.0f}"
-                else:
-                    quarterly_summary = self.df.groupby('Quarter').agg({
-                        'Sales (INR)': 'sum',
-                        'Profit (INR)': 'sum' if 'Profit (INR)' in self.df.columns else lambda x: x,
-                        'Customers': 'mean'
-                    }).round(0)
-                    best_quarter = quarterly_summary['Sales (INR)'].idxmax()
-                    return f"Quarterly Performance Summary:\n{quarterly_summary.to_string()}\n\nBest performing quarter: {best_quarter}"
-        
-        # Growth and trends
-        elif any(word in query_lower for word in ['growth', 'trend', 'increase', 'improvement']):
-            if 'Revenue Growth (%)' in self.df.columns:
-                final_growth = self.df['Revenue Growth (%)'].iloc[-1]
-                monthly_growth = self.df['Revenue Growth (%)'].diff().mean()
-                return f"Business Growth Analysis:\n• Total growth: {final_growth:.1f}% over the year\n• Average monthly growth: {monthly_growth:.1f}%\n• Trend: Strong upward trajectory"
+    @staticmethod
+    def _profit(data: Dict[str, Any]):
+        if 'Profit (INR)' in data:
+            return data['Profit (INR)']
+        return data['Sales (INR)'] - data['Expenses (INR)']
+    
+    def _scope_label(self, period: str, year: Optional[int] = None, entity: Optional[str] = None) -> str:
+        """Period name, with its year once the data spans several years and the branch if one was named"""
+        label = f"{period} {year}" if year is not None and len(self.index.years) > 1 else period
+        if entity:
+            label = f"{label} ({self.index.resolve_entity(entity)})"
+        return label
+    
+    def _no_data(self, period: Optional[str], parsed: ParsedQuery) -> str:
+        """Answer for a period, year or branch the data has no rows for"""
+        label = " ".join(str(part) for part in (period, parsed.year) if part)
+        if parsed.entity:
+            label = f"{label} ({parsed.entity})" if label else parsed.entity
+        return f"No data found for {label}"
+    
+    def _answer_profit(self, parsed: ParsedQuery) -> Optional[str]:
+        if parsed.month:
+            month_data = self.get_monthly_summary(parsed.month, parsed.year, parsed.entity)
+            if 'error' not in month_data:
+                label = self._scope_label(month_data['Month'], entity=parsed.entity)
+                return f"Profit for {label}: ₹{self._profit(month_data):,}"
+            return self._no_data(parsed.month.title(), parsed)
+        elif parsed.quarter:
+            totals = self.index.quarter(parsed.quarter, parsed.year, parsed.entity)
+            if totals is not None:
+                label = self._scope_label(parsed.quarter, totals['Year'], parsed.entity)
+                return f"Total profit for {label}: ₹{self._profit(totals):,}"
+            return self._no_data(parsed.quarter, parsed)
+        elif parsed.year or parsed.entity:
+            years = [parsed.year] if parsed.year else self.index.years
+            scoped = [totals for totals in (self.index.year(year, parsed.entity) for year in years) if totals]
+            if scoped:
+                total_profit = sum(self._profit(totals) for totals in scoped)
+                if parsed.year:
+                    return f"Total profit for {self._scope_label(str(parsed.year), entity=parsed.entity)}: ₹{total_profit:,}"
+                return f"Total profit across all months ({self.index.resolve_entity(parsed.entity)}): ₹{total_profit:,}"
+            return self._no_data(None, parsed)
+        else:
+            if 'Profit (INR)' in self.df.columns:
+                total_profit = self.df['Profit (INR)'].sum()
             else:
-                sales_growth = ((self.df['Sales (INR)'].iloc[-1] - self.df['Sales (INR)'].iloc[0]) / self.df['Sales (INR)'].iloc[0]) * 100
-                return f"Sales growth over period: {sales_growth:.1f}%"
-        
-        # Customer queries
-        elif 'retention' in query_lower:
-            if 'Customer Retention (%)' in self.df.columns:
-                avg_retention = self.df['Customer Retention (%)'].mean()
-                final_retention = self.df['Customer Retention (%)'].iloc[-1]
-                improvement = final_retention - self.df['Customer Retention (%)'].iloc[0]
-                return f"Customer Retention Analysis:\n• Current retention: {final_retention:.1f}%\n• Average retention: {avg_retention:.1f}%\n• Improvement: +{improvement:.1f}% over the year"
-        
-        # Marketing efficiency
-        elif 'marketing' in query_lower or 'acquisition' in query_lower:
-            if 'Marketing Spend (INR)' in self.df.columns and 'New Customers' in self.df.columns:
-                total_marketing = self.df['Marketing Spend (INR)'].sum()
-                total_new_customers = self.df['New Customers'].sum()
-                cost_per_acquisition = total_marketing / total_new_customers if total_new_customers > 0 else 0
-                return f"Marketing Performance:\n• Total marketing spend: ₹{total_marketing:,}\n• New customers acquired: {total_new_customers}\n• Cost per acquisition: ₹{cost_per_acquisition:,.0f}"
-        
-        # Insights and recommendations
-        elif any(word in query_lower for word in ['suggest', 'recommend', 'advice', 'improve', 'insight']):
-            insights = self.get_business_insights()
-            return "\n".join([f"• {insight}" for insight in insights])
-        
-        # Summary queries
-        elif any(word in query_lower for word in ['summary', 'overview', 'performance']):
+                total_profit = self.df['Sales (INR)'].sum() - self.df['Expenses (INR)'].sum()
+            return f"Total profit across all months: ₹{total_profit:,}"
+    
+    def _answer_sales(self, parsed: ParsedQuery) -> Optional[str]:
+        if parsed.has('highest', 'best', 'maximum'):
+            # The best row itself - with several branches a month label has several rows
+            best = self.stats.best_row
+            entity = entity_column(self.df)
+            scope = f" ({best[entity]})" if entity else ""
+            return f"Highest sales: ₹{best['Sales (INR)']:,} in {best['Month']}{scope}"
+        elif parsed.has('total'):
             summary = self.get_monthly_summary()
-            insights = self.get_business_insights()
-            
-            result = f"""
+            return f"Total sales: ₹{summary['Total_Sales']:,}"
+        else:
+            return f"Average monthly sales: ₹{self.stats.avg_sales:,.0f}"
+    
+    def _answer_customers(self, parsed: ParsedQuery) -> Optional[str]:
+        avg_customers = self.stats.avg_customers
+        return f"Average customers per month: {avg_customers:.0f}"
+    
+    def _answer_expenses(self, parsed: ParsedQuery) -> Optional[str]:
+        if parsed.has('total'):
+            summary = self.get_monthly_summary()
+            return f"Total expenses: ₹{summary['Total_Expenses']:,}"
+        else:
+            return f"Average monthly expenses: ₹{self.df['Expenses (INR)'].mean():,.0f}"
+    
+    def _answer_quarter(self, parsed: ParsedQuery) -> Optional[str]:
+        if 'Quarter' not in self.df.columns:
+            return None
+        if parsed.quarter:
+            totals = self.index.quarter(parsed.quarter, parsed.year, parsed.entity)
+            if totals is None:
+                return self._no_data(parsed.quarter, parsed)
+            label = self._scope_label(parsed.quarter, totals['Year'], parsed.entity)
+            avg_customers = totals['Customers'] / totals['count']
+            return f"{label} Performance:\n• Sales: ₹{totals['Sales (INR)']:,}\n• Profit: ₹{self._profit(totals):,}\n• Avg Customers: {avg_customers:.0f}"
+        else:
+            # Per year too, so Q1 of different years isn't added together
+            quarterly_summary = self.df.groupby(self.stats.quarter_keys, observed=True).agg({
+                'Sales (INR)': 'sum',
+                'Profit (INR)': 'sum' if 'Profit (INR)' in self.df.columns else lambda x: x,
+                'Customers': 'mean'
+            }).round(0)
+            best_quarter = quarterly_summary['Sales (INR)'].idxmax()
+            if isinstance(best_quarter, tuple):
+                best_quarter = f"{best_quarter[1]} {best_quarter[0]}"
+            return f"Quarterly Performance Summary:\n{quarterly_summary.to_string()}\n\nBest performing quarter: {best_quarter}"
+    
+    def _answer_growth(self, parsed: ParsedQuery) -> Optional[str]:
+        # Rows appended without the percentages don't count
+        growth = self.df['Revenue Growth (%)'].dropna() if 'Revenue Growth (%)' in self.df.columns else ()
+        if len(growth):
+            final_growth = growth.iloc[-1]
+            monthly_growth = growth.diff().mean()
+            return f"Business Growth Analysis:\n• Total growth: {final_growth:.1f}% over the year\n• Average monthly growth: {monthly_growth:.1f}%\n• Trend: Strong upward trajectory"
+        else:
+            sales_growth = ((self.df['Sales (INR)'].iloc[-1] - self.df['Sales (INR)'].iloc[0]) / self.df['Sales (INR)'].iloc[0]) * 100
+            return f"Sales growth over period: {sales_growth:.1f}%"
+    
+    def _answer_retention(self, parsed: ParsedQuery) -> Optional[str]:
+        retention = self.df['Customer Retention (%)'].dropna() if 'Customer Retention (%)' in self.df.columns else ()
+        if len(retention):
+            avg_retention = retention.mean()
+            final_retention = retention.iloc[-1]
+            improvement = final_retention - retention.iloc[0]
+            return f"Customer Retention Analysis:\n• Current retention: {final_retention:.1f}%\n• Average retention: {avg_retention:.1f}%\n• Improvement: +{improvement:.1f}% over the year"
+        return None
+    
+    def _answer_marketing(self, parsed: ParsedQuery) -> Optional[str]:
+        if 'Marketing Spend (INR)' in self.df.columns and 'New Customers' in self.df.columns:
+            total_marketing = self.stats.total_marketing
+            total_new_customers = self.stats.total_new_customers
+            cost_per_acquisition = total_marketing / total_new_customers if total_new_customers > 0 else 0
+            return f"Marketing Performance:\n• Total marketing spend: ₹{total_marketing:,}\n• New customers acquired: {total_new_customers}\n• Cost per acquisition: ₹{cost_per_acquisition:,.0f}"
+        return None
+    
+    def _answer_insights(self, parsed: ParsedQuery) -> Optional[str]:
+        insights = self.get_business_insights()
+        return "\n".join([f"• {insight}" for insight in insights])
+    
+    def _answer_summary(self, parsed: ParsedQuery) -> Optional[str]:
+        summary = self.get_monthly_summary()
+        insights = self.get_business_insights()
+        
+        result = f"""
 📊 Business Performance Summary:
 • Total Sales: ₹{summary['Total_Sales']:,}
 • Total Expenses: ₹{summary['Total_Expenses']:,}
@@ -248,21 +419,71 @@ class SimpleBusinessAgent:
 
 🔍 Key Insights:
 {chr(10).join([f"• {insight}" for insight in insights])}
-            """.strip()
-            return result
+        """.strip()
+        return result
+    
+    # Intent -> handler, tried in the router's rule order until one answers
+    _HANDLERS = {
+        'profit': _answer_profit,
+        'sales': _answer_sales,
+        'customers': _answer_customers,
+        'expenses': _answer_expenses,
+        'quarter': _answer_quarter,
+        'growth': _answer_growth,
+        'retention': _answer_retention,
+        'marketing': _answer_marketing,
+        'insights': _answer_insights,
+        'summary': _answer_summary,
+    }
+    
+    def _answer(self, query: str) -> Optional[str]:
+        """Answer from the data, or None if no handler applies"""
+        with self._pin():
+            parsed = QUERY_ROUTER.parse(query, entities=self.index.entities)
+            if parsed.intents:
+                key, version = response_key(parsed, self.index), self.dataset.version
+                answer = self.responses.get(key, version)
+                if answer is not None:
+                    return answer
+            for intent in parsed.intents:
+                answer = self._HANDLERS[intent](self, parsed)
+                if answer is not None:
+                    self.responses.put(key, version, answer)
+                    return answer
+        return None
+    
+    def simple_query(self, query: str) -> str:
+        """Handle simple queries about the business"""
+        if self.df is None:
+            return "❌ No data available. Please load business data first."
         
-        else:
-            return """
-I can help you analyze your business data. Try asking:
-• "What was the profit in May?"
-• "Which month had highest sales?"
-• "Give me business insights"
-• "Show performance summary"
-• "What are total expenses?"
-• "How many customers on average?"
-            """.strip()
+        answer = self._answer(query)
+        return HELP_TEXT if answer is None else answer
+    
+    def stream_query(self, query: str) -> Iterator[str]:
+        """Answer in the LLM's words, yielding text as it is generated
+        
+        The LLM only rephrases the ``simple_query`` answer; without one,
+        that answer is yielded in one piece.
+        """
+        if self.df is None:
+            yield "❌ No data available. Please load business data first."
+            return
+        answer = self._answer(query)
+        if answer is None:
+            yield HELP_TEXT
+            return
+        yield from stream_answer(self.llm, query, answer)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the response cache and, once loaded, the LLM prompt cache"""
+        stats = {"responses": self.responses.stats()}
+        if hasattr(self._llm, 'stats'):
+            stats["llm"] = self._llm.stats()
+        return stats
 
-if __name__ == "__main__":
+def run_cli():
+    """Interactive command line session"""
     agent = SimpleBusinessAgent()
     print("\n🤖 Simple Business AI Agent Ready!")
     
@@ -280,4 +501,7 @@ if __name__ == "__main__":
             print("\n👋 Goodbye!")
             break
         except Exception as e:
-            print(f"❌ Error: {e}")
\ No newline at end of file
+            print(f"❌ Error: {e}")
+
+if __name__ == "__main__":
+    run_cli()
@@ -1,39 +1,165 @@
-from langchain.agents import Tool, AgentExecutor, create_react_agent
-from langchain.prompts import PromptTemplate
-from langchain_community.llms import Ollama
-from langchain_community.chat_models import ChatOllama
-from rag_pipeline import SMERAGPipeline  # Keep simple imports
+# LangChain, chromadb and sentence-transformers are imported only on the
+# code paths that use them, so importing this module stays cheap
+from rag_pipeline import SMERAGPipeline, metadata_filter  # Keep simple imports
 from tools import BusinessAnalysisTools
+from query_router import ParsedQuery, QueryRouter
+from data_loader import append_business_rows
+from data_watcher import DatasetWatcher
+from response_cache import ResponseCache, question_scope, response_key
+from semantic_cache import SemanticCache
+from llm import create_llm, stream_answer
+from planner import MONTH, QUARTER, ToolCall, plan, run_plan
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+import pandas as pd
 import json
+import os
+import threading
+
+# Intents in priority order; unmatched questions fall back to RAG search.
+# "search" marks topics only the RAG search covers, so a multi-part
+# question can combine a search with tool answers.
+QUERY_ROUTER = QueryRouter(
+    rules=[
+        ("profit", ["profit"]),
+        ("quarter", ["quarter"]),
+        ("suggest", ["suggest", "improve"]),
+        ("search", ["sales", "revenue", "customer", "expense", "marketing", "retention", "inventory", "trend"]),
+    ]
+)
+
+# Threads running the tool calls of a multi-part question
+PLANNER_WORKERS = int(os.environ.get("SME_PLANNER_WORKERS", 4))
 
 class SMEBusinessAgent:
     def __init__(self):
-        # Initialize components
-        self.rag_pipeline = SMERAGPipeline()
+        # Only the pandas-based tools load eagerly - they answer most
+        # questions. The embedding model, vector store, LLM and LangChain
+        # tools are created on the first query that needs them.
         self.business_tools = BusinessAnalysisTools()
+        self._watcher = DatasetWatcher(self.business_tools.data_path, self._apply_appended, self._reload_data)
+        self._watcher.mark_loaded()
+        self.responses = ResponseCache()
+        self.semantic_answers = SemanticCache()
         
-        # Initialize LLM (using a simple approach first)
-        try:
-            self.llm = ChatOllama(model="llama3:8b", temperature=0.1)
-        except:
-            # Fallback to a mock LLM for testing
-            self.llm = None
-            print("⚠️ Ollama not available, using mock responses")
-        
-        # Create vector store if not exists
-        try:
-            self.rag_pipeline.collection = self.rag_pipeline.client.get_collection("sme_business_data")
-        except:
-            self.rag_pipeline.create_vector_store()
-        
-        self.tools = self._create_tools()
+        self._rag_pipeline = None
+        self._llm = None
+        self._llm_loaded = False
+        self._tools = None
+        self._executor = None
+        self._init_lock = threading.RLock()
+    
+    @property
+    def rag_pipeline(self) -> SMERAGPipeline:
+        """RAG pipeline with a synced vector store, loaded on first use"""
+        if self._rag_pipeline is None:
+            with self._init_lock:
+                if self._rag_pipeline is None:
+                    pipeline = SMERAGPipeline()
+                    # Load the persisted vector store, embedding only new or changed rows
+                    pipeline.create_vector_store()
+                    self._rag_pipeline = pipeline
+        return self._rag_pipeline
+    
+    @property
+    def llm(self):
+        """ChatOllama model, created on first use (None if unavailable)"""
+        if not self._llm_loaded:
+            with self._init_lock:
+                if not self._llm_loaded:
+                    try:
+                        # ChatOllama unless SME_LLM picks another backend
+                        self._llm = create_llm()
+                    except:
+                        # Fallback to a mock LLM for testing
+                        self._llm = None
+                        print("⚠️ Ollama not available, using mock responses")
+                    self._llm_loaded = True
+        return self._llm
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool for the tool calls of multi-part questions, created on first use"""
+        if self._executor is None:
+            with self._init_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(PLANNER_WORKERS, thread_name_prefix="sme-tool")
+        return self._executor
+    
+    @property
+    def tools(self):
+        """LangChain tools, created on first use"""
+        if self._tools is None:
+            with self._init_lock:
+                if self._tools is None:
+                    self._tools = self._create_tools()
+        return self._tools
+    
+    def warm_up(self, background: bool = True):
+        """Load the RAG pipeline ahead of the first search, by default in a background thread"""
+        if background:
+            threading.Thread(target=lambda: self.rag_pipeline, name="sme-warm-up", daemon=True).start()
+        else:
+            self.rag_pipeline
+    
+    def append_rows(self, rows: pd.DataFrame) -> int:
+        """Append rows to the data file, the analysis tools and (once loaded) the
+        vector store, embedding only the new rows; returns the new dataset version"""
+        with self._watcher.lock, self._init_lock:
+            # Pick up other writers' changes first so the appended rows land after them
+            self._watcher.check()
+            pipeline = self._rag_pipeline
+            previous_signature = pipeline.source_signature() if pipeline else None
+            if pipeline is not None:
+                # Before writing, so a model that fails to load leaves the file untouched
+                pipeline.model
+            start = len(self.business_tools.df)
+            appended = append_business_rows(self.business_tools.data_path, rows)
+            version = self.business_tools.add_rows(appended)
+            if pipeline is not None:
+                pipeline.add_rows(appended, start, previous_signature)
+            self._watcher.mark_loaded()
+        return version
+    
+    def _apply_appended(self, rows: pd.DataFrame):
+        start = len(self.business_tools.df)
+        self.business_tools.add_rows(rows)
+        # Embed just the new rows; add_rows falls back to a full sync if the
+        # store wasn't in sync with the file before the append
+        with self._init_lock:
+            pipeline = self._rag_pipeline
+            if pipeline is not None:
+                pipeline.add_rows(rows, start, pipeline.synced_signature)
+        print(f"🔄 Added {len(rows)} appended rows ({len(self.business_tools.df)} total)")
+    
+    def _reload_data(self):
+        self.business_tools.reload()
+        self._sync_vector_store()
+        print(f"🔄 Reloaded {len(self.business_tools.df)} rows of business data")
+    
+    def _sync_vector_store(self):
+        # A store that isn't loaded yet syncs itself on first use
+        with self._init_lock:
+            if self._rag_pipeline is not None:
+                self._rag_pipeline.create_vector_store()
+    
+    def reload_if_changed(self) -> bool:
+        """Pick up changes to the data file now; returns True if anything changed"""
+        return self._watcher.check()
+    
+    def start_watching(self, interval: Optional[float] = None) -> DatasetWatcher:
+        """Pick up changes to the data file in the background, without blocking queries"""
+        if interval is not None:
+            self._watcher.interval = interval
+        return self._watcher.start()
     
     def _create_tools(self):
         """Create LangChain tools from our business functions"""
+        from langchain.agents import Tool
         
         def search_business_data(query: str) -> str:
             """Search business data using RAG"""
-            results = self.rag_pipeline.query(query, n_results=2)
+            results = self.rag_pipeline.query(query, n_results=2, where=self._search_filter(query))
             return f"Relevant data: {results['documents'][0][:2]}"
         
         def get_monthly_profit_tool(month: str) -> str:
@@ -59,7 +185,7 @@ class SMEBusinessAgent:
             ),
             Tool(
                 name="get_monthly_profit",
-                description="Get detailed profit information for a specific month (e.g., 'May', 'Jun')",
+                description="Get detailed profit information for a specific month (e.g., 'May', 'Jun', 'May-24')",
                 func=get_monthly_profit_tool
             ),
             Tool(
@@ -74,38 +200,211 @@ class SMEBusinessAgent:
             )
         ]
     
-    def simple_query(self, user_question: str) -> str:
-        """Handle queries without LangChain agent (for testing)"""
-        question_lower = user_question.lower()
-        
-        # Profit queries
-        if "profit" in question_lower:
-            months = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
-            for month in months:
-                if month in question_lower:
-                    result = self.business_tools.get_monthly_profit(month)
-                    if "error" not in result:
-                        return f"In {result['month']}: Sales ₹{result['sales']}, Expenses ₹{result['expenses']}, Profit ₹{result['profit']} (Margin: {result['profit_margin']}%)"
-        
-        # Quarterly queries
-        if any(q in question_lower for q in ["q1", "quarter 1", "first quarter"]):
-            result = self.business_tools.get_quarterly_summary("Q1")
-            return f"Q1 2023 Summary: Total Sales ₹{result['total_sales']}, Total Profit ₹{result['total_profit']}, Avg Profit Margin {result['avg_profit_margin']}%"
-        
-        # Suggestions
-        if "suggest" in question_lower or "improve" in question_lower:
-            months = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
-            for month in months:
-                if month in question_lower:
-                    suggestions = self.business_tools.suggest_cost_optimization(month)
-                    return "Business Improvement Suggestions:\n" + "\n".join([f"• {s}" for s in suggestions])
-        
-        # RAG search for general queries
-        results = self.rag_pipeline.query(user_question, n_results=1)
-        if results['documents']:
+    def _answer_profit(self, parsed: ParsedQuery) -> Optional[str]:
+        if parsed.month:
+            result = self.business_tools.get_monthly_profit(parsed.month, parsed.year, parsed.entity)
+            if "error" not in result:
+                scope = f" ({result['entity']})" if 'entity' in result else ""
+                return f"In {result['month']}{scope}: Sales ₹{result['sales']}, Expenses ₹{result['expenses']}, Profit ₹{result['profit']} (Margin: {result['profit_margin']}%)"
+        return None
+    
+    def _answer_quarter(self, parsed: ParsedQuery) -> Optional[str]:
+        if parsed.quarter:
+            result = self.business_tools.get_quarterly_summary(parsed.quarter, parsed.year, parsed.entity)
+            if "error" not in result:
+                scope = f" ({result['entity']})" if 'entity' in result else ""
+                return f"{result['quarter']} {result['year']}{scope} Summary: Total Sales ₹{result['total_sales']}, Total Profit ₹{result['total_profit']}, Avg Profit Margin {result['avg_profit_margin']}%"
+        return None
+    
+    def _answer_suggestions(self, parsed: ParsedQuery) -> Optional[str]:
+        if parsed.month:
+            suggestions = self.business_tools.suggest_cost_optimization(parsed.month, parsed.year, parsed.entity)
+            # Name the month, so answers for several months stay apart
+            totals = self.business_tools.index.month(parsed.month, parsed.year, parsed.entity)
+            label = f" for {totals['Month']}" if totals else ""
+            return f"Business Improvement Suggestions{label}:\n" + "\n".join([f"• {s}" for s in suggestions])
+        return None
+    
+    # Intent -> handler, tried in the router's rule order until one answers
+    _HANDLERS = {
+        "profit": _answer_profit,
+        "quarter": _answer_quarter,
+        "suggest": _answer_suggestions,
+    }
+    
+    # Intent -> (LangChain tool name, period it is called per) for the planner
+    _INTENT_TOOLS = {
+        "profit": ("get_monthly_profit", MONTH),
+        "quarter": ("get_quarterly_summary", QUARTER),
+        "suggest": ("get_cost_optimization", MONTH),
+        "search": ("search_business_data", None),
+    }
+    
+    _TOOL_HANDLERS = {
+        "get_monthly_profit": _answer_profit,
+        "get_quarterly_summary": _answer_quarter,
+        "get_cost_optimization": _answer_suggestions,
+    }
+    
+    def _run_tool(self, call: ToolCall) -> Optional[str]:
+        """Answer one step of a plan"""
+        if call.tool == "search_business_data":
+            results = self.rag_pipeline.query(call.question, n_results=1, where=metadata_filter(call.query) or {})
+            return self._answer_from_documents(results) if results['documents'] and results['documents'][0] else None
+        return self._TOOL_HANDLERS[call.tool](self, call.query)
+    
+    def _answer_from_tools(self, user_question: str) -> Optional[str]:
+        """Answer deterministic questions with the analysis tools, or return None
+        
+        A question that plans to several tool calls - several months or
+        quarters, or several intents - gets their answers joined; plans
+        with a RAG search run their calls concurrently.
+        """
+        dataset = self.business_tools.dataset
+        parsed = QUERY_ROUTER.parse(user_question, entities=dataset.index.entities)
+        if not parsed.intents:
+            return None
+        key = response_key(parsed, dataset.index)
+        answer = self.responses.get(key, dataset.version)
+        if answer is not None:
+            return answer
+        
+        calls = plan(user_question, parsed, self._INTENT_TOOLS)
+        if len(calls) > 1:
+            searches = any(call.tool == "search_business_data" for call in calls)
+            # Index lookups take microseconds - less than handing them to a
+            # thread - so only plans that wait on a search run concurrently
+            answers = run_plan(calls, self._run_tool, self.executor if searches else None)
+            answer = "\n\n".join(answer for answer in answers if answer) or None
+            # Search results depend on the exact wording, not just the key
+            cacheable = not searches
+        else:
+            # Tried in the router's rule order until one answers
+            for intent in parsed.intents:
+                handler = self._HANDLERS.get(intent)
+                answer = handler(self, parsed) if handler else None
+                if answer is not None:
+                    break
+            cacheable = True
+        if answer is not None and cacheable:
+            self.responses.put(key, dataset.version, answer)
+        return answer
+    
+    @staticmethod
+    def _answer_from_documents(results) -> str:
+        if results['documents'] and results['documents'][0]:
             return f"Based on your data:\n{results['documents'][0][0]}"
         
         return "I can help you with profit analysis, quarterly summaries, and business suggestions. Try asking about specific months or quarters!"
+    
+    def _search_filter(self, user_question: str) -> Dict[str, Any]:
+        """Metadata filter for a question's RAG search: the periods, year and branch it names"""
+        parsed = QUERY_ROUTER.parse(user_question, entities=self.business_tools.dataset.index.entities)
+        return metadata_filter(parsed) or {}
+    
+    def _semantic_scope(self, user_question: str, mode: str):
+        """(scope, topic, dataset version) a question's answers are cached under in ``semantic_answers``
+        
+        The scope is the periods, year and entity the question is about, so
+        paraphrases that route differently ("May profit", "how much did we
+        make in May?") can share an answer. The topic - the router's
+        keywords - keeps "sales in May" and "expenses in May" apart when both
+        have one; their intents are the same ("search"). ``mode`` keeps
+        plain search answers apart from LLM-written ones.
+        """
+        dataset = self.business_tools.dataset
+        parsed = QUERY_ROUTER.parse(user_question, entities=dataset.index.entities)
+        return (mode,) + question_scope(parsed, dataset.index), parsed.keywords, dataset.version
+    
+    def _question_embedding(self, user_question: str):
+        """Embedding of a question, or None if the embedding model isn't installed"""
+        try:
+            return self.rag_pipeline.embed_query(user_question)
+        except ImportError:
+            return None
+    
+    def simple_query(self, user_question: str) -> str:
+        """Handle queries without LangChain agent (for testing)"""
+        answer = self._answer_from_tools(user_question)
+        if answer is not None:
+            return answer
+        
+        # RAG search for general queries; a rewording of an earlier one is
+        # answered from the semantic cache with the embedding the search needs anyway
+        scope, topic, version = self._semantic_scope(user_question, "search")
+        embedding = self.rag_pipeline.embed_query(user_question)
+        answer = self.semantic_answers.get(embedding, version, scope, user_question, topic)
+        if answer is not None:
+            return answer
+        results = self.rag_pipeline.query(user_question, n_results=1, where=self._search_filter(user_question))
+        answer = self._answer_from_documents(results)
+        self.semantic_answers.put(embedding, version, answer, scope, user_question, topic)
+        return answer
+    
+    def stream_query(self, user_question: str) -> Iterator[str]:
+        """Answer with the LLM, yielding text as it is generated
+        
+        The tools - or, for other questions, the RAG search - supply the
+        facts the LLM answers from. Without an LLM the ``simple_query``
+        answer is yielded in one piece. Written answers are kept in the
+        semantic cache, so a rewording of an earlier question is answered
+        without any tool call or generation.
+        """
+        scope, topic, version = self._semantic_scope(user_question, "llm")
+        embedding = self._question_embedding(user_question) if self.llm is not None else None
+        if embedding is not None:
+            answer = self.semantic_answers.get(embedding, version, scope, user_question, topic)
+            if answer is not None:
+                yield answer
+                return
+        
+        facts = self._answer_from_tools(user_question)
+        fallback = None
+        if facts is None:
+            results = self.rag_pipeline.query(user_question, n_results=3, where=self._search_filter(user_question))
+            fallback = self._answer_from_documents(results)
+            documents = results['documents'][0] if results['documents'] else []
+            if not documents:
+                yield fallback
+                return
+            facts = "\n\n".join(documents)
+        
+        pieces = []
+        for piece in stream_answer(self.llm, user_question, facts, fallback):
+            pieces.append(piece)
+            yield piece
+        answer = "".join(pieces)
+        # An answer equal to the fallback means the LLM failed; don't keep it
+        if embedding is not None and answer not in (facts, fallback):
+            self.semantic_answers.put(embedding, version, answer, scope, user_question, topic)
+    
+    def simple_query_batch(self, user_questions: List[str]) -> List[str]:
+        """Answer many questions, returning answers in input order
+        
+        Profit, quarter and suggestion questions are answered by the tools
+        without touching the embedding model; the rest share one batched
+        RAG search.
+        """
+        answers = [self._answer_from_tools(question) for question in user_questions]
+        
+        unanswered = [i for i, answer in enumerate(answers) if answer is None]
+        if unanswered:
+            questions = [user_questions[i] for i in unanswered]
+            batch = self.rag_pipeline.query_batch(questions, n_results=1,
+                                                  wheres=[self._search_filter(question) for question in questions])
+            for i, results in zip(unanswered, batch):
+                answers[i] = self._answer_from_documents(results)
+        
+        return answers
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the response and semantic caches and, once loaded, the RAG and LLM caches"""
+        stats = {"responses": self.responses.stats(), "semantic": self.semantic_answers.stats()}
+        if self._rag_pipeline is not None:
+            stats.update(self._rag_pipeline.cache_stats())
+        if hasattr(self._llm, 'stats'):
+            stats["llm"] = self._llm.stats()
+        return stats
 
 # Test the agent
 if __name__ == "__main__":
@@ -0,0 +1,247 @@
+"""
+Precomputed lookup index over the business DataFrame - month, quarter and
+year aggregates per entity (branch), built once so tool lookups are
+dictionary hits.
+"""
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from query_router import entity_key
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+MONTH_NUMBERS = {name: number for number, name in enumerate(MONTHS, start=1)}
+
+MONTH_QUARTERS = {name: f"Q{(number - 1) // 3 + 1}" for name, number in MONTH_NUMBERS.items()}
+
+# Optional column naming the branch/entity a row belongs to; without one
+# the whole file is a single entity
+ENTITY_COLUMNS = ['Branch', 'Entity']
+
+_PERIOD_RE = re.compile(r"^\s*(?:(?P<name>[a-z]{3})[a-z]*\.?[\s\-/']*(?P<year>\d{4}|\d{2})?"
+                        r"|(?P<iso_year>\d{4})-(?P<iso_month>\d{1,2}))\s*$")
+
+
+def _full_year(year: int) -> int:
+    """Expand two-digit years ("23" -> 2023)"""
+    return 2000 + year if year < 100 else year
+
+
+def parse_period(text: str) -> Tuple[Optional[int], Optional[int]]:
+    """Parse "May", "May-23", "May 2024" or "2024-05" into (month number, year)"""
+    match = _PERIOD_RE.match(str(text).lower())
+    if not match:
+        return None, None
+    if match.group('iso_year'):
+        month = int(match.group('iso_month'))
+        return (month if 1 <= month <= 12 else None), int(match.group('iso_year'))
+    year = match.group('year')
+    return MONTH_NUMBERS.get(match.group('name')), (_full_year(int(year)) if year else None)
+
+
+def entity_column(df: pd.DataFrame) -> Optional[str]:
+    """Name of the branch/entity column in ``df``, if it has one"""
+    return next((column for column in ENTITY_COLUMNS if column in df.columns), None)
+
+
+def parse_periods(df: pd.DataFrame) -> pd.DataFrame:
+    """Period columns for ``df``: year, month number (1-12) and quarter
+
+    The month comes from the ``Month`` label ("May-23" or "2023-05"); the
+    year from the ``Year`` column when present, else from the label.
+    Each distinct label is parsed once. Unparseable values are left as NaN.
+    """
+    codes, labels = pd.factorize(df['Month'])
+    # One extra slot at the end so missing labels (code -1) come out empty
+    parsed = [parse_period(label) for label in labels] + [(None, None)]
+    month = np.array([number or np.nan for number, _ in parsed], dtype=float)[codes]
+    year = np.array([year or np.nan for _, year in parsed], dtype=float)[codes]
+    quarter = np.array([MONTH_QUARTERS[MONTHS[number - 1]] if number else None for number, _ in parsed],
+                       dtype=object)[codes]
+    if 'Year' in df.columns:
+        year = pd.to_numeric(df['Year'], errors='coerce').astype(float).fillna(pd.Series(year, index=df.index))
+    return pd.DataFrame({'year': year, 'month': month, 'quarter': quarter}, index=df.index)
+
+
+class BusinessIndex:
+    """(entity, year, month/quarter) -> column totals, plus first row positions
+
+    Every numeric column (other than ``Year``) is summed per group along
+    with a row count, so averages are ``total / count`` and new rows can be
+    folded in with ``add_rows`` without rescanning the frame. Each group is
+    indexed under its entity and under ``None``, which stands for all
+    entities combined; lookups default to ``None`` and to the most recent
+    year that has the requested period.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        # entity_key(name) -> name, the form QueryRouter.parse expects
+        self.entities: Dict[str, str] = {}
+        self.month_totals: Dict[Tuple[Optional[str], int, int], Dict[str, float]] = {}
+        self.quarter_totals: Dict[Tuple[Optional[str], int, str], Dict[str, float]] = {}
+        self.year_totals: Dict[Tuple[Optional[str], int], Dict[str, float]] = {}
+        self.month_positions: Dict[Tuple[Optional[str], int, int], int] = {}
+        self.month_labels: Dict[Tuple[Optional[str], int, int], str] = {}
+        self._latest_years: Dict[Tuple[Optional[str], object], int] = {}
+        self.add_rows(df, start=0)
+
+    def add_rows(self, df: pd.DataFrame, start: int):
+        """Index ``df`` whose first row sits at position ``start`` of the full frame"""
+        periods = parse_periods(df)
+        columns = [column for column in df.columns
+                   if column != 'Year' and pd.api.types.is_numeric_dtype(df[column])]
+        frame = df[columns].assign(
+            _year=periods['year'].values, _month=periods['month'].values,
+            _quarter=periods['quarter'].values, _position=np.arange(start, start + len(df)),
+        )
+        entity = entity_column(df)
+        scopes = [(None, frame.assign(_entity=''))]
+        if entity:
+            names = df[entity].astype(str).str.strip()
+            for name in names.unique():
+                self.entities.setdefault(entity_key(name), name)
+            scopes.append((entity, frame.assign(_entity=names.values)))
+
+        for scope, scoped in scopes:
+            dated = scoped.dropna(subset=['_year'])
+            monthly = dated.dropna(subset=['_month'])
+            self._merge(self.year_totals, dated, ['_entity', '_year'], scope)
+            self._merge(self.quarter_totals, monthly, ['_entity', '_year', '_quarter'], scope)
+            self._merge(self.month_totals, monthly, ['_entity', '_year', '_month'], scope)
+
+            firsts = monthly.drop_duplicates(['_entity', '_year', '_month'])
+            labels = df['Month'].iloc[firsts['_position'].to_numpy() - start].astype(str)
+            for name, year, month, position, label in zip(firsts['_entity'], firsts['_year'], firsts['_month'],
+                                                          firsts['_position'], labels):
+                key = (name if scope else None, int(year), int(month))
+                self.month_positions.setdefault(key, int(position))
+                self.month_labels.setdefault(key, label)
+
+        for key in self.month_totals:
+            self._note_year(key[0], key[2], key[1])
+        for key in self.quarter_totals:
+            self._note_year(key[0], key[2], key[1])
+        for key in self.year_totals:
+            self._note_year(key[0], None, key[1])
+
+    def copy(self) -> "BusinessIndex":
+        """Independent copy, so rows can be added without disturbing readers of this one"""
+        clone = BusinessIndex.__new__(BusinessIndex)
+        clone.entities = dict(self.entities)
+        clone.month_totals = {key: dict(totals) for key, totals in self.month_totals.items()}
+        clone.quarter_totals = {key: dict(totals) for key, totals in self.quarter_totals.items()}
+        clone.year_totals = {key: dict(totals) for key, totals in self.year_totals.items()}
+        clone.month_positions = dict(self.month_positions)
+        clone.month_labels = dict(self.month_labels)
+        clone._latest_years = dict(self._latest_years)
+        return clone
+
+    def _note_year(self, entity: Optional[str], period, year: int):
+        latest = self._latest_years.get((entity, period))
+        if latest is None or year > latest:
+            self._latest_years[(entity, period)] = year
+
+    @staticmethod
+    def _merge(totals: Dict, frame: pd.DataFrame, keys: List[str], scope: Optional[str]):
+        value_columns = [column for column in frame.columns
+                         if not column.startswith('_')]
+        groups = frame.groupby(keys, observed=True)
+
+        def normalize(key):
+            # (entity, year[, month or quarter]) with plain ints; None for the combined scope
+            entity, year, *period = key
+            return (entity if scope else None, int(year),
+                    *(int(value) if isinstance(value, float) else value for value in period))
+
+        for key, count in groups.size().items():
+            entry = totals.setdefault(normalize(key), {'count': 0})
+            entry['count'] += int(count)
+        # Column by column so each total keeps its column's dtype
+        for column, sums in groups[value_columns].sum().items():
+            for key, value in sums.items():
+                entry = totals[normalize(key)]
+                entry[column] = entry.get(column, 0) + value
+
+    def resolve_entity(self, entity: Optional[str]) -> Optional[str]:
+        """Canonical entity name for ``entity`` (case-insensitive); None stays None"""
+        if entity is None:
+            return None
+        return self.entities.get(entity_key(entity), entity)
+
+    @property
+    def years(self) -> List[int]:
+        """Years with data, oldest first"""
+        return sorted(key[1] for key in self.year_totals if key[0] is None)
+
+    def latest_year(self, entity: Optional[str] = None, period=None) -> Optional[int]:
+        """Most recent year with data for ``entity`` and (optionally) a month number or quarter"""
+        return self._latest_years.get((self.resolve_entity(entity), period))
+
+    def month_key(self, month: str, year: Optional[int] = None,
+                  entity: Optional[str] = None) -> Optional[Tuple[Optional[str], int, int]]:
+        """Index key for a month label or name; a year in the label wins over ``year``
+
+        Text that isn't a month (e.g. "23") falls back to the first indexed
+        label containing it.
+        """
+        entity = self.resolve_entity(entity)
+        number, label_year = parse_period(month)
+        if number is None:
+            text = str(month).strip().lower()
+            return next((key for key, label in self.month_labels.items()
+                         if key[0] == entity and text and text in label.lower()
+                         and (year is None or key[1] == year)), None)
+        year = label_year or year or self.latest_year(entity, number)
+        key = (entity, year, number)
+        return key if key in self.month_totals else None
+
+    def month(self, month: str, year: Optional[int] = None,
+              entity: Optional[str] = None) -> Optional[Dict[str, float]]:
+        """Totals for a month ("May", "May-23", "2023-05"), with its ``Month`` label and ``Year``"""
+        key = self.month_key(month, year, entity)
+        if key is None:
+            return None
+        return dict(self.month_totals[key], Month=self.month_labels[key], Year=key[1])
+
+    def month_position(self, month: str, year: Optional[int] = None,
+                       entity: Optional[str] = None) -> Optional[int]:
+        """Position of the first row for a month"""
+        key = self.month_key(month, year, entity)
+        return None if key is None else self.month_positions[key]
+
+    def quarter(self, quarter: str, year: Optional[int] = None,
+                entity: Optional[str] = None) -> Optional[Dict[str, float]]:
+        """Totals for a quarter ("Q1"), with its ``Year``; defaults to the most recent year"""
+        quarter = quarter.upper()
+        entity = self.resolve_entity(entity)
+        year = year or self.latest_year(entity, quarter)
+        totals = self.quarter_totals.get((entity, year, quarter))
+        return None if totals is None else dict(totals, Year=year)
+
+    def year(self, year: Optional[int] = None, entity: Optional[str] = None) -> Optional[Dict[str, float]]:
+        """Totals for a calendar year; defaults to the most recent year"""
+        entity = self.resolve_entity(entity)
+        year = year or self.latest_year(entity)
+        totals = self.year_totals.get((entity, year))
+        return None if totals is None else dict(totals, Year=year)
+
+    def months(self, entity: Optional[str] = None) -> List[Dict[str, float]]:
+        """Monthly totals for one entity (or all combined), in period order"""
+        entity = self.resolve_entity(entity)
+        keys = sorted(key[1:] for key in self.month_totals if key[0] == entity)
+        return [self.month_totals[(entity, *key)] for key in keys]
+
+
+# Quick check of the index
+if __name__ == "__main__":
+    frame = pd.DataFrame({
+        'Month': ['Dec-23', 'Jan-24', 'Jan-24', 'Feb-24'],
+        'Branch': ['North', 'North', 'South', 'North'],
+        'Sales (INR)': [100, 120, 80, 130],
+        'Expenses (INR)': [60, 70, 50, 75],
+    })
+    index = BusinessIndex(frame)
+    print("Jan (all branches):", index.month("Jan"))
+    print("Jan South:", index.month("jan", entity="south"))
+    print("Q4 2023:", index.quarter("Q4", 2023))
+    print("2024 North:", index.year(entity="North"))
@@ -0,0 +1,144 @@
+"""
+Memoized dataset-level statistics shared by the agents and analysis tools
+"""
+import numpy as np
+import pandas as pd
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional
+from business_index import parse_periods
+
+# Running totals that can be carried forward when rows are appended
+ADDITIVE_TOTALS = {
+    'total_sales': 'Sales (INR)',
+    'total_expenses': 'Expenses (INR)',
+    'total_customers': 'Customers',
+    'total_marketing': 'Marketing Spend (INR)',
+    'total_new_customers': 'New Customers',
+    'total_inventory_cost': 'Inventory Cost (INR)',
+}
+
+
+class DatasetStats:
+    """Statistics for one loaded version of the business DataFrame
+
+    Every value is computed on first use and then reused. Owners create a
+    new ``DatasetStats`` whenever they load a new frame, which is what
+    invalidates the old values - a stats object never outlives its data.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._memo: Dict[str, Any] = {}
+
+    @classmethod
+    def rolled(cls, previous: "DatasetStats", df: pd.DataFrame, rows: pd.DataFrame) -> "DatasetStats":
+        """Stats for ``df`` - ``previous.df`` plus ``rows`` - reusing the running
+        totals ``previous`` already computed instead of rescanning the frame"""
+        stats = cls(df)
+        for name, column in ADDITIVE_TOTALS.items():
+            if name in previous.__dict__ and column in rows.columns:
+                stats.__dict__[name] = previous.__dict__[name] + rows[column].sum()
+        return stats
+
+    def memoize(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Return the value cached under ``name``, computing it on first use"""
+        try:
+            return self._memo[name]
+        except KeyError:
+            value = self._memo[name] = compute()
+            return value
+
+    @cached_property
+    def profit(self) -> pd.Series:
+        if 'Profit (INR)' in self.df.columns:
+            return self.df['Profit (INR)']
+        return self.df['Sales (INR)'] - self.df['Expenses (INR)']
+
+    @cached_property
+    def total_sales(self):
+        return self.df['Sales (INR)'].sum()
+
+    @cached_property
+    def total_expenses(self):
+        return self.df['Expenses (INR)'].sum()
+
+    @cached_property
+    def total_customers(self):
+        return self.df['Customers'].sum()
+
+    @cached_property
+    def total_inventory_cost(self):
+        return self.df['Inventory Cost (INR)'].sum()
+
+    # Averages derive from the running totals so they roll forward too
+    @cached_property
+    def avg_sales(self) -> float:
+        return self.total_sales / len(self.df)
+
+    @cached_property
+    def avg_profit(self) -> float:
+        return self.profit.mean()
+
+    @cached_property
+    def avg_customers(self) -> float:
+        return self.total_customers / len(self.df)
+
+    @cached_property
+    def best_row(self) -> pd.Series:
+        """The row (one month of one branch) with the highest sales"""
+        return self.df.loc[self.df['Sales (INR)'].idxmax()]
+
+    @cached_property
+    def best_month(self) -> str:
+        return self.best_row['Month']
+
+    @cached_property
+    def worst_month(self) -> str:
+        return self.df.loc[self.df['Sales (INR)'].idxmin(), 'Month']
+
+    @cached_property
+    def quarter_keys(self) -> List:
+        """Group-by keys for per-quarter figures: the quarter, plus the year when the data spans several
+
+        Quarters come from the Month labels, as in ``BusinessIndex``, so rows
+        without a Quarter value still count; the column fills in labels that
+        don't parse.
+        """
+        periods = parse_periods(self.df)
+        quarters = periods['quarter']
+        if 'Quarter' in self.df.columns:
+            quarters = quarters.fillna(self.df['Quarter'].astype(object))
+        quarters = quarters.rename('Quarter')
+        years = periods['year'].astype('Int64').rename('Year')
+        return [years, quarters] if years.nunique() > 1 else [quarters]
+
+    @cached_property
+    def quarterly_sales(self) -> pd.Series:
+        """Sales per quarter, labelled "Q1 2024" when the data spans several years"""
+        sales = self.df.groupby(self.quarter_keys, observed=True)['Sales (INR)'].sum()
+        if sales.index.nlevels == 2:
+            sales.index = [f"{quarter} {year}" for year, quarter in sales.index]
+        return sales
+
+    @cached_property
+    def total_marketing(self):
+        return self.df['Marketing Spend (INR)'].sum()
+
+    @cached_property
+    def total_new_customers(self):
+        return self.df['New Customers'].sum()
+
+    def month_averages(self, index, entity: Optional[str] = None) -> Dict[str, float]:
+        """Average monthly inventory cost and marketing ROI (customers per ₹1000
+        of marketing spend) of one entity, or all combined, over ``index``'s
+        month totals - ``index`` being this data's ``BusinessIndex``"""
+        entity = index.resolve_entity(entity)
+
+        def compute():
+            months = index.months(entity)
+            return {
+                'inventory_cost': float(np.mean([m['Inventory Cost (INR)'] for m in months])),
+                'marketing_roi': float(np.mean([m['Customers'] / (m['Marketing Spend (INR)'] / 1000)
+                                                for m in months])),
+            }
+        return self.memoize(f"month_averages:{entity}", compute)
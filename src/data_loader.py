@@ -0,0 +1,373 @@
+"""
+Shared loader for the business dataset with a memory-mapped columnar cache
+
+The first load parses the CSV and writes each column as a ``.npy`` file in
+``data/.cache/<csv name>/``. Later loads - in this or any other process -
+memory-map those files while the CSV is unchanged, so processes share the
+same pages through the OS page cache instead of each parsing and holding a
+private copy.
+
+Frames come back in a compact schema (see ``apply_schema``): narrow
+integers for money and counts, and categorical labels.
+"""
+import hashlib
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Iterator, Optional, Tuple
+from business_index import parse_periods
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'sme_data.csv')
+
+_CACHE_FORMAT = 3
+
+# Compact schema: "(INR)" money columns and counts are stored as the
+# smallest integer type that holds them (whole rupees, so exact) and
+# repeated labels as categoricals. Columns not covered here keep the dtype
+# pandas infers; "(%)" columns stay float64, as narrower floats would not
+# round-trip values such as 7.8.
+CATEGORY_COLUMNS = ['Month', 'Quarter', 'Branch', 'Entity']
+INTEGER_COLUMNS = {'Year': np.int16, 'Customers': np.int32, 'New Customers': np.int32}
+MONEY_SUFFIX = '(INR)'
+PERCENT_SUFFIX = '(%)'
+
+# Columns every appended row must have: those the analysis tools and the
+# RAG documents read
+REQUIRED_COLUMNS = ['Month', 'Sales (INR)', 'Expenses (INR)', 'Customers',
+                    'Inventory Cost (INR)', 'Marketing Spend (INR)']
+
+# Bytes before an old end-of-file that must be unchanged for growth to count as an append
+_TAIL_BYTES = 4096
+
+
+def resolve_data_path(data_path: str = "data/sme_data.csv") -> str:
+    """Find the business CSV from the current directory, the project root or its parent"""
+    possible_paths = [
+        data_path,
+        DEFAULT_DATA_PATH,
+        os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'sme_data.csv'),
+        '../data/sme_data.csv'
+    ]
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+    return data_path  # Use original path as fallback
+
+
+def _smallest_int(column: pd.Series, minimum) -> pd.Series:
+    """Cast whole-number columns to the smallest int type from ``minimum`` up; leave others alone"""
+    if column.isna().any() or not pd.api.types.is_numeric_dtype(column):
+        return column
+    values = column.to_numpy()
+    if pd.api.types.is_float_dtype(column) and not np.array_equal(values, np.round(values)):
+        return column
+    for dtype in (np.int16, np.int32, np.int64):
+        if np.dtype(dtype).itemsize < np.dtype(minimum).itemsize:
+            continue
+        info = np.iinfo(dtype)
+        if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+            return column.astype(dtype)
+    return column
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Return ``df`` with the compact business schema applied"""
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if name in CATEGORY_COLUMNS and not pd.api.types.is_numeric_dtype(column):
+            # Categories in order of first appearance so charts and group-bys
+            # keep the file's (chronological) order rather than sorting labels
+            column = column.astype(pd.CategoricalDtype(column.dropna().unique()))
+        elif name in INTEGER_COLUMNS:
+            column = _smallest_int(column, INTEGER_COLUMNS[name])
+        elif name.endswith(MONEY_SUFFIX):
+            column = _smallest_int(column, np.int32)
+        columns[name] = column
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _cache_dir(csv_path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(directory, '.cache', os.path.splitext(name)[0])
+
+
+def _file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_manifest(cache_dir: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(cache_dir, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('format') == _CACHE_FORMAT else None
+
+
+def _write_manifest(cache_dir: str, manifest: dict):
+    # Write-then-rename so readers never see a partial manifest
+    path = os.path.join(cache_dir, 'manifest.json')
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, path)
+
+
+def _load_cached(cache_dir: str, manifest: dict) -> pd.DataFrame:
+    columns = {}
+    for column in manifest['columns']:
+        array = np.load(os.path.join(cache_dir, column['file']), mmap_mode='r')
+        if 'categories' in column:
+            array = pd.Categorical.from_codes(array, categories=column['categories'])
+        columns[column['name']] = array
+    return pd.DataFrame(columns, copy=False)
+
+
+def _save_array(path: str, array: np.ndarray):
+    """Save ``array`` to ``path`` without ever truncating a file in place
+
+    Another process may have the same CSV's cache files memory-mapped, and
+    truncating a mapped file crashes it (SIGBUS). The array is written to a
+    temporary file that replaces ``path``, so a mapped file keeps its old,
+    identical contents.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        # Windows won't replace a mapped file; an existing one has the same contents
+        os.remove(temp_path)
+        if not os.path.exists(path):
+            raise
+
+
+def _write_cache(cache_dir: str, df: pd.DataFrame, source: dict) -> bool:
+    """Write ``df`` as one .npy file per column; returns False if it can't be cached"""
+    arrays = []
+    for name in df.columns:
+        column = df[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            arrays.append((name, column.cat.codes.to_numpy(), {'categories': column.cat.categories.tolist()}))
+        elif pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+            arrays.append((name, column.to_numpy(), {}))
+        elif not column.isna().any():
+            arrays.append((name, np.asarray(column.astype(str), dtype=str), {}))
+        else:
+            # Text columns with gaps can't round-trip through a fixed-width array
+            return False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    previous = _read_manifest(cache_dir)
+    # Files are named after the CSV contents so a reader of the old manifest
+    # keeps valid files while the new ones are written
+    prefix = source['sha1'][:12]
+    manifest = {'format': _CACHE_FORMAT, 'source': source, 'columns': []}
+    for i, (name, array, extra) in enumerate(arrays):
+        file_name = f"{prefix}-{i}.npy"
+        _save_array(os.path.join(cache_dir, file_name), array)
+        manifest['columns'].append({'name': name, 'file': file_name, **extra})
+    _write_manifest(cache_dir, manifest)
+
+    if previous:
+        current = {column['file'] for column in manifest['columns']}
+        for column in previous['columns']:
+            if column['file'] not in current:
+                try:
+                    os.remove(os.path.join(cache_dir, column['file']))
+                except OSError:
+                    pass
+    return True
+
+
+def load_cached_business_data(data_path: str) -> Optional[pd.DataFrame]:
+    """The columnar cache of the business CSV, or None if it isn't current
+
+    Raises ``FileNotFoundError`` if the CSV does not exist.
+    """
+    stat = os.stat(data_path)
+    cache_dir = _cache_dir(data_path)
+    manifest = _read_manifest(cache_dir)
+    source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    try:
+        if manifest:
+            cached = manifest['source']
+            if cached['size'] == source['size'] and cached['mtime_ns'] == source['mtime_ns']:
+                return _load_cached(cache_dir, manifest)
+            if cached['size'] == source['size'] and cached['sha1'] == _file_sha1(data_path):
+                # Touched but not modified
+                _write_manifest(cache_dir, {**manifest, 'source': {**cached, **source}})
+                return _load_cached(cache_dir, manifest)
+    except (OSError, KeyError, ValueError):
+        pass
+    return None
+
+
+def load_business_data(data_path: str, use_cache: bool = True) -> pd.DataFrame:
+    """Load the business CSV with the compact schema, reusing the columnar
+    cache while the CSV is unchanged
+
+    Raises ``FileNotFoundError`` if the CSV does not exist. Cached columns
+    are read-only memory maps; add new columns rather than writing in place.
+    """
+    stat = os.stat(data_path)
+    if not use_cache:
+        return apply_schema(pd.read_csv(data_path))
+
+    cached = load_cached_business_data(data_path)
+    if cached is not None:
+        return cached
+
+    df = apply_schema(pd.read_csv(data_path))
+    cache_dir = _cache_dir(data_path)
+    source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    try:
+        source['sha1'] = _file_sha1(data_path)
+        if _write_cache(cache_dir, df, source):
+            # Hand out the memory-mapped copy so this process shares pages too
+            manifest = _read_manifest(cache_dir)
+            if manifest:
+                return _load_cached(cache_dir, manifest)
+    except OSError as e:
+        print(f"⚠️ Could not write data cache: {e}")
+    return df
+
+
+def iter_business_chunks(data_path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yield the business data as frames of at most ``chunksize`` rows, with the compact schema
+
+    Slices of the memory-mapped cache while it is current, so only the
+    current chunk's pages need to be resident; otherwise the CSV is read
+    ``chunksize`` rows at a time, so memory stays bounded on a cold cache.
+    Row labels are positions in the file either way.
+    """
+    df = load_cached_business_data(data_path)
+    if df is None:
+        for chunk in pd.read_csv(data_path, chunksize=chunksize):
+            yield apply_schema(chunk)
+        return
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def concat_rows(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """Return ``df`` with ``rows`` appended, keeping the compact schema
+
+    ``rows`` is aligned to ``df``'s columns; categorical columns gain any
+    new labels instead of being widened to plain strings.
+    """
+    rows = rows.reindex(columns=df.columns)
+    index = pd.RangeIndex(len(df) + len(rows))
+    columns = {}
+    for name in df.columns:
+        old, new = df[name], rows[name]
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            # New labels go after the existing ones so the old codes stay valid
+            known = set(old.cat.categories)
+            categories = old.cat.categories.append(
+                pd.Index([label for label in new.dropna().astype(str).unique() if label not in known],
+                         dtype=old.cat.categories.dtype))
+            codes = pd.Categorical(new.astype(object), categories=categories).codes
+            columns[name] = pd.Series(pd.Categorical.from_codes(
+                np.concatenate([old.cat.codes.to_numpy(), codes]), categories=categories), index=index)
+        else:
+            columns[name] = pd.concat([old, new], ignore_index=True)
+    return pd.DataFrame(columns, index=index)
+
+
+def file_tail_digest(data_path: str, size: int) -> str:
+    """Digest of the last few KB before offset ``size``, to tell an append from a rewrite"""
+    with open(data_path, 'rb') as f:
+        f.seek(max(0, size - _TAIL_BYTES))
+        return hashlib.sha1(f.read(min(size, _TAIL_BYTES))).hexdigest()
+
+
+def read_appended_rows(data_path: str, offset: int, tail_digest: Optional[str] = None,
+                       end: Optional[int] = None) -> Optional[Tuple[pd.DataFrame, int]]:
+    """Parse the rows added to the CSV between byte ``offset`` and ``end``, with the compact schema
+
+    Only complete lines are parsed, so a row still being written is left
+    for the next call. Returns the rows and the offset just past the last
+    line read - where the next call should start - or None if the bytes
+    before ``offset`` no longer match ``tail_digest`` (the file was
+    rewritten rather than appended to), in which case callers should
+    reload it in full.
+    """
+    if tail_digest is not None and file_tail_digest(data_path, offset) != tail_digest:
+        return None
+    with open(data_path, 'rb') as f:
+        header = f.readline()
+        start = max(offset, len(header))
+        f.seek(start)
+        tail = f.read() if end is None else f.read(max(0, end - start))
+    tail = tail[:tail.rfind(b'\n') + 1]
+    return apply_schema(pd.read_csv(io.BytesIO(header + tail))), start + len(tail)
+
+
+def append_business_rows(data_path: str, rows: pd.DataFrame) -> pd.DataFrame:
+    """Append ``rows`` to the business CSV and return them as parsed back from the file
+
+    Raises ``ValueError`` for rows missing a required column or carrying a
+    column the CSV doesn't have. A missing ``Profit (INR)`` is derived from
+    sales and expenses, and a missing ``Quarter`` or ``Year`` from the Month
+    label. A columnar cache that was current before
+    the append is extended rather than left to be rebuilt from the CSV.
+    """
+    header = list(pd.read_csv(data_path, nrows=0).columns)
+    unknown = [column for column in rows.columns if column not in header]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    missing = [column for column in REQUIRED_COLUMNS if column not in rows.columns or rows[column].isna().any()]
+    if missing:
+        raise ValueError(f"Missing required values: {', '.join(missing)}")
+    numeric = [column for column in rows.columns
+               if column in INTEGER_COLUMNS or column.endswith((MONEY_SUFFIX, PERCENT_SUFFIX))]
+    invalid = [column for column in numeric
+               if (pd.to_numeric(rows[column], errors='coerce').isna() & rows[column].notna()).any()]
+    if invalid:
+        raise ValueError(f"Non-numeric values in: {', '.join(invalid)}")
+    if 'Profit (INR)' in header:
+        # Profit is derived, so rows may leave it out
+        derived = pd.to_numeric(rows['Sales (INR)']) - pd.to_numeric(rows['Expenses (INR)'])
+        rows = rows.assign(**{'Profit (INR)': rows.get('Profit (INR)', derived)})
+        rows['Profit (INR)'] = rows['Profit (INR)'].fillna(derived)
+    # So are the quarter and year, from the Month label
+    periods = parse_periods(rows)
+    for column, derived in (('Quarter', periods['quarter']), ('Year', periods['year'].astype('Int64'))):
+        if column in header:
+            rows = rows.assign(**{column: rows[column].fillna(derived) if column in rows else derived})
+
+    before = os.stat(data_path)
+    cache_dir = _cache_dir(data_path)
+    manifest = _read_manifest(cache_dir)
+    cache_current = bool(manifest) and manifest['source'].get('size') == before.st_size \
+        and manifest['source'].get('mtime_ns') == before.st_mtime_ns
+
+    with open(data_path, 'rb') as f:
+        f.seek(max(0, before.st_size - 1))
+        needs_newline = before.st_size > 0 and f.read(1) not in (b'\n', b'\r')
+    with open(data_path, 'a', encoding='utf-8', newline='') as f:
+        if needs_newline:
+            f.write('\n')
+        rows.reindex(columns=header).to_csv(f, header=False, index=False, lineterminator='\n')
+        end = f.tell()
+
+    # Only this write's bytes, even if another writer has appended since
+    appended, _ = read_appended_rows(data_path, before.st_size, end=end)
+    if cache_current:
+        try:
+            stat = os.stat(data_path)
+            source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': _file_sha1(data_path)}
+            _write_cache(cache_dir, concat_rows(_load_cached(cache_dir, manifest), appended), source)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ Could not extend data cache: {e}")
+    return appended
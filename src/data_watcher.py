@@ -0,0 +1,113 @@
+"""
+Background watcher for the business data file
+
+Long-running servers start a ``DatasetWatcher`` instead of checking the file
+on every request. It polls the file's size and modification time from a
+daemon thread; when the file only grew it parses just the new rows,
+otherwise it asks its owner to reload. All parsing and index building
+happens on the watcher thread, and owners publish the result by swapping in
+a new snapshot, so requests never wait for a reload.
+"""
+import os
+import threading
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+
+from data_loader import file_tail_digest, read_appended_rows
+
+DEFAULT_POLL_INTERVAL = float(os.environ.get("SME_DATA_POLL_INTERVAL", 2.0))
+
+
+class DatasetWatcher:
+    """Detects appends to or rewrites of ``path`` and reports them to callbacks
+
+    ``on_append(rows)`` receives the rows added since the last load;
+    ``on_reload()`` is called when the file changed in any other way. Owners
+    call ``mark_loaded`` after loading the file themselves and hold ``lock``
+    while they write to it, so the watcher never mistakes their own write
+    for someone else's.
+    """
+
+    def __init__(self, path: str, on_append: Callable[[pd.DataFrame], None], on_reload: Callable[[], None],
+                 interval: float = DEFAULT_POLL_INTERVAL):
+        self.path = path
+        self.on_append = on_append
+        self.on_reload = on_reload
+        self.interval = interval
+        self.lock = threading.RLock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._tail: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def signature(self) -> Optional[Tuple[int, int]]:
+        """(mtime, size) of the file, or None if it is missing"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def mark_loaded(self, signature: Optional[Tuple[int, int]] = None):
+        """Record the file version the owner has loaded
+
+        Pass the signature taken before reading the file, so a write that
+        lands during the load is still picked up by the next check.
+        """
+        with self.lock:
+            signature = signature or self.signature()
+            self._signature = signature
+            try:
+                self._tail = file_tail_digest(self.path, signature[1]) if signature else None
+            except OSError:
+                self._tail = None
+
+    def check(self) -> bool:
+        """Apply any change to the file now; returns True if the owner's data changed"""
+        signature = self.signature()
+        if signature is None or signature == self._signature:
+            return False
+
+        with self.lock:
+            if signature == self._signature:
+                return False
+            previous = self._signature
+            try:
+                appended = None
+                if previous and self._tail and signature[1] > previous[1]:
+                    # Up to the size just checked, so rows written after it
+                    # are read by the next check rather than twice
+                    appended = read_appended_rows(self.path, previous[1], self._tail, end=signature[1])
+                if appended is not None:
+                    rows, consumed = appended
+                    if consumed == previous[1]:
+                        # Only a partial line so far
+                        return False
+                    self.on_append(rows)
+                    # A trailing partial line is read once it is complete
+                    signature = (signature[0], consumed)
+                else:
+                    self.on_reload()
+            except Exception as e:
+                # Keep serving the previous data, e.g. while the file is mid-write
+                print(f"⚠️ Reload failed, keeping previous data: {e}")
+                return False
+            self.mark_loaded(signature)
+        return True
+
+    def start(self) -> "DatasetWatcher":
+        """Start polling on a daemon thread (no-op if already running)"""
+        with self.lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="sme-data-watcher", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
@@ -0,0 +1,54 @@
+"""
+Versioned snapshot of the business data - the frame with its lookup index
+and statistics - that can be extended with appended rows incrementally
+"""
+import itertools
+import pandas as pd
+from typing import Callable, Optional
+from business_index import BusinessIndex
+from business_stats import DatasetStats
+from data_loader import concat_rows
+
+# Process-wide so every snapshot, whoever built it, has a distinct version
+_VERSIONS = itertools.count(1)
+
+
+def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Add the ``Profit`` and ``Profit Margin %`` columns used by the analysis tools"""
+    df = df.copy(deep=False)
+    df['Profit'] = df['Sales (INR)'] - df['Expenses (INR)']
+    df['Profit Margin %'] = (df['Profit'] / df['Sales (INR)']) * 100
+    return df
+
+
+class BusinessDataset:
+    """One version of the business data: ``df``, ``index``, ``stats`` and ``version``
+
+    Snapshots are never modified once built. ``append`` returns a new
+    snapshot whose index is extended with just the new rows and whose
+    running totals are carried forward, so owners can swap it in while
+    readers finish with the old one. ``version`` changes with every
+    snapshot, which is what caches key on.
+    """
+
+    def __init__(self, df: pd.DataFrame, prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                 index: Optional[BusinessIndex] = None, stats: Optional[DatasetStats] = None):
+        self.prepare = prepare
+        self.df = prepare(df) if prepare and index is None else df
+        self.index = index if index is not None else BusinessIndex(self.df)
+        self.stats = stats if stats is not None else DatasetStats(self.df)
+        self.version = next(_VERSIONS)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def append(self, rows: pd.DataFrame) -> "BusinessDataset":
+        """Return a new snapshot with ``rows`` added after the current rows"""
+        if self.prepare:
+            rows = self.prepare(rows)
+        start = len(self.df)
+        df = concat_rows(self.df, rows)
+        added = df.iloc[start:]
+        index = self.index.copy()
+        index.add_rows(added, start)
+        return BusinessDataset(df, self.prepare, index, DatasetStats.rolled(self.stats, df, added))
@@ -0,0 +1,169 @@
+"""
+LLM access for the agents - the configured chat model, a local fake for
+tests and demos, and the prompt that turns tool results into an answer
+
+``SME_LLM`` picks the backend: "ollama" (default) for ChatOllama - or,
+without LangChain, ``OllamaHTTPLLM`` talking to the same server - "fake"
+for ``FakeStreamingLLM``, or "none" to answer from the tools only. Models
+from ``create_llm`` are wrapped in the prompt cache from ``llm_cache``.
+"""
+import json
+import os
+import time
+import urllib.request
+from typing import Iterator, NamedTuple, Optional
+
+LLM_BACKEND = os.environ.get("SME_LLM", "ollama").lower()
+OLLAMA_MODEL = os.environ.get("SME_OLLAMA_MODEL", "llama3:8b")
+OLLAMA_URL = os.environ.get("SME_OLLAMA_URL", "http://localhost:11434")
+
+ANSWER_PROMPT = """You are a business analyst for a small business. Answer the question
+in a few sentences using only the data below. Quote amounts in ₹ exactly as given.
+
+Question: {question}
+
+Data:
+{facts}
+
+Answer:"""
+
+
+class LLMChunk(NamedTuple):
+    """A piece of generated text, shaped like LangChain's message chunks"""
+    content: str
+
+
+class FakeStreamingLLM:
+    """Local stand-in for ChatOllama that streams a canned reply word by word
+
+    Without a fixed ``response`` it repeats the data section of an
+    ``ANSWER_PROMPT``, so its answers stay correct. ``delay`` seconds pass
+    before each word, like the per-token latency of a real model.
+    """
+
+    model = "fake"
+    temperature = 0.0
+
+    def __init__(self, response: Optional[str] = None, delay: float = 0.02):
+        self.response = response
+        self.delay = delay
+        self.calls = 0
+
+    def _reply(self, prompt) -> str:
+        if self.response is not None:
+            return self.response
+        text = prompt if isinstance(prompt, str) else prompt[-1].content
+        facts = text.rpartition("Data:\n")[2].rpartition("\n\nAnswer:")[0]
+        return facts or text
+
+    def stream(self, prompt) -> Iterator[LLMChunk]:
+        self.calls += 1
+        reply = self._reply(prompt)
+        start = 0
+        while start < len(reply):
+            # One word plus the whitespace after it per chunk
+            end = reply.find(' ', start)
+            end = len(reply) if end == -1 else end + 1
+            if self.delay:
+                time.sleep(self.delay)
+            yield LLMChunk(reply[start:end])
+            start = end
+
+    def invoke(self, prompt) -> LLMChunk:
+        return LLMChunk(''.join(chunk.content for chunk in self.stream(prompt)))
+
+
+class OllamaHTTPLLM:
+    """Minimal Ollama client over its HTTP API, for installs without LangChain
+
+    ``stream`` posts to ``/api/generate`` and yields the reply as the
+    server streams it (one JSON object per line). HTTP and connection
+    errors propagate, like ChatOllama's.
+    """
+
+    def __init__(self, model: str = OLLAMA_MODEL, temperature: float = 0.1, base_url: str = OLLAMA_URL,
+                 timeout: float = 120):
+        self.model = model
+        self.temperature = temperature
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def stream(self, prompt) -> Iterator[LLMChunk]:
+        text = prompt if isinstance(prompt, str) else "\n".join(message.content for message in prompt)
+        body = json.dumps({"model": self.model, "prompt": text, "stream": True,
+                           "options": {"temperature": self.temperature}}).encode()
+        request = urllib.request.Request(f"{self.base_url}/api/generate", data=body,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            for line in response:
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if message.get("error"):
+                    raise RuntimeError(f"Ollama error: {message['error']}")
+                if message.get("response"):
+                    yield LLMChunk(message["response"])
+                if message.get("done"):
+                    return
+        # The server hung up before saying it was done
+        raise ConnectionError("Ollama stream ended early")
+
+    def invoke(self, prompt) -> LLMChunk:
+        return LLMChunk(''.join(chunk.content for chunk in self.stream(prompt)))
+
+
+def create_llm(backend: Optional[str] = None, temperature: float = 0.1, cache_path: Optional[str] = None):
+    """Chat model for ``backend`` (default ``SME_LLM``), or None for "none"
+
+    The model answers through a ``CachedLLM`` stored at ``cache_path``
+    (default ``SME_LLM_CACHE``; "" for no cache).
+    """
+    from llm_cache import DEFAULT_LLM_CACHE_PATH, CachedLLM
+
+    backend = (backend or LLM_BACKEND).lower()
+    if backend == "none":
+        return None
+    if backend == "fake":
+        llm = FakeStreamingLLM(delay=float(os.environ.get("SME_FAKE_LLM_DELAY", 0.02)))
+    elif backend == "ollama":
+        try:
+            from langchain_community.chat_models import ChatOllama
+            llm = ChatOllama(model=OLLAMA_MODEL, base_url=OLLAMA_URL, temperature=temperature)
+        except ImportError:
+            llm = OllamaHTTPLLM(OLLAMA_MODEL, temperature)
+    else:
+        raise ValueError(f"Unknown SME_LLM backend: {backend}")
+    cache_path = DEFAULT_LLM_CACHE_PATH if cache_path is None else cache_path
+    return CachedLLM(llm, cache_path) if cache_path else llm
+
+
+def stream_answer(llm, question: str, facts: str, fallback: Optional[str] = None) -> Iterator[str]:
+    """Stream the LLM's answer to ``question`` from ``facts`` as text pieces
+
+    Without an LLM, or if it fails before producing any text (e.g. Ollama
+    isn't running), ``fallback`` - by default the facts themselves - is
+    yielded in one piece instead.
+    """
+    fallback = facts if fallback is None else fallback
+    if llm is None:
+        yield fallback
+        return
+    started = False
+    try:
+        for chunk in llm.stream(ANSWER_PROMPT.format(question=question, facts=facts)):
+            text = getattr(chunk, 'content', chunk)
+            if text:
+                started = True
+                yield text
+    except Exception as e:
+        if started:
+            raise
+        print(f"⚠️ LLM unavailable ({e}), answering from the data")
+        yield fallback
+
+
+# Quick check of the fake model
+if __name__ == "__main__":
+    llm = FakeStreamingLLM()
+    for piece in stream_answer(llm, "What was the profit in May?", "Profit for May-23: ₹235,000"):
+        print(repr(piece))
@@ -0,0 +1,197 @@
+"""
+Prompt-level cache for LLM calls
+
+``CachedLLM`` wraps a chat model so a prompt it has answered before - same
+model, temperature and rendered prompt - is served from a SQLite file
+instead of being generated again, across restarts and processes. Identical
+prompts that arrive while one is still generating share that generation:
+every caller streams the same chunks as they are produced. The file keeps
+at most ``SME_LLM_CACHE_SIZE`` responses, dropping the oldest, and ones
+older than ``SME_LLM_CACHE_TTL`` seconds are regenerated (0: never).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from llm import LLMChunk
+
+# Set SME_LLM_CACHE="" to disable the cache
+DEFAULT_LLM_CACHE_PATH = os.environ.get(
+    "SME_LLM_CACHE", os.path.join(os.path.dirname(__file__), '..', 'data', '.cache', 'llm_cache.sqlite')
+)
+LLM_CACHE_SIZE = int(os.environ.get("SME_LLM_CACHE_SIZE", 10000))
+LLM_CACHE_TTL = float(os.environ.get("SME_LLM_CACHE_TTL", 7 * 24 * 3600))
+
+
+def render_prompt(prompt) -> str:
+    """Text of a prompt given as a string or a list of chat messages"""
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(f"{getattr(message, 'type', 'message')}: {getattr(message, 'content', message)}"
+                     for message in prompt)
+
+
+class _Generation:
+    """Chunks of one in-flight generation, readable by any number of callers"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.condition = threading.Condition()
+
+    def add(self, text: str):
+        with self.condition:
+            self.chunks.append(text)
+            self.condition.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None):
+        with self.condition:
+            self.done = True
+            self.error = error
+            self.condition.notify_all()
+
+    def follow(self) -> Iterator[str]:
+        """Yield every chunk, from the first, as it becomes available"""
+        position = 0
+        while True:
+            with self.condition:
+                while position >= len(self.chunks) and not self.done:
+                    self.condition.wait()
+                pending = self.chunks[position:]
+                done, error = self.done, self.error
+            yield from pending
+            position += len(pending)
+            if done and position >= len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class CachedLLM:
+    """Chat model wrapper with a persistent prompt cache and in-flight coalescing
+
+    Generations run on their own thread, so a caller that stops reading
+    early doesn't stall the others sharing the prompt, and the full answer
+    is still cached. Failed generations are not cached. Storing a response
+    evicts those past ``ttl`` seconds old (0 for no limit) and then the
+    oldest beyond ``maxsize``.
+    """
+
+    def __init__(self, llm, path: str = DEFAULT_LLM_CACHE_PATH, maxsize: int = LLM_CACHE_SIZE,
+                 ttl: float = LLM_CACHE_TTL):
+        self.llm = llm
+        self.model = str(getattr(llm, 'model', type(llm).__name__))
+        self.temperature = getattr(llm, 'temperature', None)
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evicted = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, _Generation] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db_lock = threading.Lock()
+        with self._db_lock, self._db:
+            # WAL lets other processes read while one writes
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, model TEXT, "
+                             "temperature REAL, prompt TEXT, response TEXT, created REAL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+
+    def key(self, prompt: str) -> str:
+        """Cache key of a rendered prompt for this model and temperature"""
+        return hashlib.sha256(json.dumps([self.model, self.temperature, prompt]).encode()).hexdigest()
+
+    def _oldest_fresh(self) -> float:
+        """Creation time below which a stored response has expired"""
+        return time.time() - self.ttl if self.ttl else float('-inf')
+
+    def _load(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._db.execute("SELECT response FROM responses WHERE key = ? AND created >= ?",
+                                   (key, self._oldest_fresh())).fetchone()
+        return None if row is None else row[0]
+
+    def _store(self, key: str, prompt: str, response: str):
+        with self._db_lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, self.model, self.temperature, prompt, response, time.time()))
+            evicted = self._db.execute("DELETE FROM responses WHERE created < ?", (self._oldest_fresh(),)).rowcount
+            if self.maxsize:
+                evicted += self._db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY created DESC LIMIT -1 OFFSET ?)", (self.maxsize,)
+                ).rowcount
+            self.evicted += evicted
+
+    def _generate(self, key: str, prompt: str, generation: _Generation):
+        error = None
+        try:
+            for chunk in self.llm.stream(prompt):
+                text = getattr(chunk, 'content', chunk)
+                if text:
+                    generation.add(text)
+            self._store(key, prompt, ''.join(generation.chunks))
+        except Exception as e:
+            error = e
+        finally:
+            # Stored before leaving the in-flight table, so no caller in
+            # between can miss both and generate it a second time
+            with self._lock:
+                self._inflight.pop(key, None)
+            generation.finish(error)
+
+    def stream(self, prompt) -> Iterator[LLMChunk]:
+        prompt = render_prompt(prompt)
+        key = self.key(prompt)
+        cached = self._load(key)
+        if cached is None:
+            with self._lock:
+                generation = self._inflight.get(key)
+                if generation is not None:
+                    self.coalesced += 1
+                else:
+                    cached = self._load(key)
+                    if cached is None:
+                        self.misses += 1
+                        generation = self._inflight[key] = _Generation()
+                        threading.Thread(target=self._generate, args=(key, prompt, generation),
+                                         name="sme-llm", daemon=True).start()
+        if cached is not None:
+            self.hits += 1
+            yield LLMChunk(cached)
+            return
+        for text in generation.follow():
+            yield LLMChunk(text)
+
+    def invoke(self, prompt) -> LLMChunk:
+        return LLMChunk(''.join(chunk.content for chunk in self.stream(prompt)))
+
+    def clear(self):
+        with self._db_lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, coalesced requests, evictions and stored responses"""
+        with self._db_lock:
+            size = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evicted": self.evicted,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "path": self.path,
+        }
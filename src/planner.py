@@ -0,0 +1,79 @@
+"""
+Query planner - splits a multi-part question into independent tool calls
+
+"Compare profit in May and June and suggest improvements for both" routes
+to the profit and suggestion intents with two months; the plan is one call
+per (intent, month) pair, four in all. The calls don't depend on each
+other, so ``run_plan`` runs them concurrently and returns their results in
+plan order.
+"""
+from concurrent.futures import Executor
+from typing import Callable, List, Mapping, NamedTuple, Optional, Tuple
+
+from query_router import ParsedQuery
+
+# Period a tool call is made for: one of the question's months or quarters
+MONTH, QUARTER = 'month', 'quarter'
+
+
+class ToolCall(NamedTuple):
+    """One step of a plan: a tool and the question narrowed to what it needs"""
+    tool: str
+    query: ParsedQuery
+    question: str
+
+
+def plan(question: str, parsed: ParsedQuery, tools: Mapping[str, Tuple[str, Optional[str]]]) -> List[ToolCall]:
+    """Tool calls answering ``parsed``, in intent order
+
+    ``tools`` maps an intent to ``(tool name, MONTH | QUARTER | None)``;
+    a month or quarter tool is called once per month or quarter mentioned
+    (and skipped if none was), any other tool once with the whole question.
+    """
+    calls = []
+    for intent in parsed.intents:
+        if intent not in tools:
+            continue
+        tool, period = tools[intent]
+        if period == MONTH:
+            calls.extend(ToolCall(tool, parsed._replace(month=month, months=(month,), quarter=None, quarters=()),
+                                  question) for month in parsed.months)
+        elif period == QUARTER:
+            calls.extend(ToolCall(tool, parsed._replace(quarter=quarter, quarters=(quarter,), month=None, months=()),
+                                  question) for quarter in parsed.quarters)
+        else:
+            calls.append(ToolCall(tool, parsed, question))
+    return calls
+
+
+def run_plan(calls: List[ToolCall], run: Callable[[ToolCall], Optional[str]],
+             executor: Optional[Executor] = None) -> List[Optional[str]]:
+    """Results of ``run(call)`` for every call, in plan order
+
+    With an ``executor`` the calls run concurrently; a call that raises
+    yields None instead of failing the whole plan.
+    """
+    def safe_run(call: ToolCall) -> Optional[str]:
+        try:
+            return run(call)
+        except Exception as e:
+            print(f"⚠️ {call.tool} failed: {e}")
+            return None
+
+    if executor is None or len(calls) < 2:
+        return [safe_run(call) for call in calls]
+    return list(executor.map(safe_run, calls))
+
+
+# Quick check of the planner
+if __name__ == "__main__":
+    from query_router import QueryRouter
+
+    router = QueryRouter([('profit', ['profit']), ('quarter', ['quarter']), ('suggest', ['suggest'])])
+    question = "Compare profit in May and June and suggest improvements for both"
+    for call in plan(question, router.parse(question), {
+        'profit': ('get_monthly_profit', MONTH),
+        'quarter': ('get_quarterly_summary', QUARTER),
+        'suggest': ('get_cost_optimization', MONTH),
+    }):
+        print(call.tool, call.query.month or call.query.quarter)
@@ -0,0 +1,209 @@
+"""
+Single-pass query router - extracts intent keywords, month, quarter, year
+and entity (branch) from a business question in one scan over its words.
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+_MONTH_WORDS = {
+    'jan': 'jan', 'january': 'jan',
+    'feb': 'feb', 'february': 'feb',
+    'mar': 'mar', 'march': 'mar',
+    'apr': 'apr', 'april': 'apr',
+    'may': 'may',
+    'jun': 'jun', 'june': 'jun',
+    'jul': 'jul', 'july': 'jul',
+    'aug': 'aug', 'august': 'aug',
+    'sep': 'sep', 'sept': 'sep', 'september': 'sep',
+    'oct': 'oct', 'october': 'oct',
+    'nov': 'nov', 'november': 'nov',
+    'dec': 'dec', 'december': 'dec',
+}
+
+_QUARTER_ORDINALS = {
+    'first': 'Q1', '1st': 'Q1',
+    'second': 'Q2', '2nd': 'Q2',
+    'third': 'Q3', '3rd': 'Q3',
+    'fourth': 'Q4', '4th': 'Q4',
+}
+
+_TOKEN_RE = re.compile(r"[a-z]+\d*|\d+")
+
+def entity_key(name: str) -> str:
+    """Lower-cased, space-separated words of an entity name ("North-East" -> "north east")"""
+    return ' '.join(_TOKEN_RE.findall(str(name).lower()))
+
+
+# Word classification kinds
+_OTHER, _KEYWORD, _MONTH, _QUARTER, _ORDINAL, _YEAR, _SHORT_NUMBER, _NUMBER, _QUARTER_WORD = range(9)
+
+# Classification of a chunk made only of ordinary words
+_ORDINARY = ((_OTHER, None),)
+_NO_KEYWORDS: FrozenSet[str] = frozenset()
+_QUARTER_KEYWORD = frozenset(['quarter'])
+
+
+class ParsedQuery(NamedTuple):
+    """Result of routing a question: matched keywords, intents and entities
+
+    ``month`` and ``quarter`` are the first ones mentioned; ``months`` and
+    ``quarters`` list every distinct one in order of mention.
+    """
+    keywords: FrozenSet[str]
+    intents: Tuple[str, ...]
+    month: Optional[str] = None
+    quarter: Optional[str] = None
+    year: Optional[int] = None
+    entity: Optional[str] = None
+    months: Tuple[str, ...] = ()
+    quarters: Tuple[str, ...] = ()
+
+    def has(self, *words: str) -> bool:
+        """Check whether any of the given keywords appeared in the question"""
+        return any(word in self.keywords for word in words)
+
+
+class QueryRouter:
+    """Precompiled keyword router
+
+    ``rules`` is an ordered list of ``(intent, keywords)``; a question's
+    intents are the rules whose keywords it mentions, in rule order.
+    ``modifiers`` are extra keywords the handlers look at (e.g. "total").
+    A question is split on whitespace and each chunk ("2023?", "Jan-23")
+    is classified once into the lower-cased words the compiled regex finds
+    in it, so keywords, month, quarter and year all come out of a single
+    pass of dictionary lookups. A chunk that is a single keyword is stored
+    as its keyword set, and questions naming no period, year or entity
+    share one result per keyword set.
+    Keywords match at the start of a word, so "customers" matches
+    "customer" while "summarize" does not match the month "mar".
+    A quarter mention such as "Q2" or "second quarter" also counts as the
+    keyword "quarter".
+    """
+
+    _MAX_MEMO = 50000
+
+    def __init__(self, rules: Sequence[Tuple[str, Iterable[str]]], modifiers: Iterable[str] = ()):
+        self.rules = [(intent, frozenset(words)) for intent, words in rules]
+        self._vocabulary = frozenset(modifiers).union(*(words for _, words in self.rules))
+        self._chunks: Dict[str, object] = {}
+        self._plain: Dict[FrozenSet[str], ParsedQuery] = {}
+
+    def _classify_word(self, word: str) -> Tuple[int, object]:
+        """Return (kind, value) for a single word"""
+        matched = frozenset(
+            word[:end] for end in range(1, len(word) + 1) if word[:end] in self._vocabulary
+        )
+        if word in _MONTH_WORDS:
+            return _MONTH, _MONTH_WORDS[word]
+        if len(word) == 2 and word[0] == 'q' and word[1] in '1234':
+            return _QUARTER, word.upper()
+        if word in _QUARTER_ORDINALS:
+            return _ORDINAL, _QUARTER_ORDINALS[word]
+        if word.isdigit():
+            number = int(word)
+            if len(word) == 4 and 1900 <= number < 2100:
+                return _YEAR, number
+            return (_SHORT_NUMBER if len(word) == 2 else _NUMBER), number
+        if word == 'quarter':
+            return _QUARTER_WORD, matched
+        if matched:
+            return _KEYWORD, matched
+        return _OTHER, None
+
+    def _classify(self, chunk: str):
+        """Classify the words of one whitespace-separated chunk (memoized)
+
+        Returns ``_ORDINARY``, the keyword set of a single-keyword chunk,
+        or a tuple of (kind, value) per word.
+        """
+        kinds = tuple(self._classify_word(word) for word in _TOKEN_RE.findall(chunk.lower()))
+        if kinds and all(kind == _OTHER for kind, _ in kinds):
+            kinds = _ORDINARY
+        elif len(kinds) == 1 and kinds[0][0] == _KEYWORD:
+            kinds = kinds[0][1]
+
+        if len(self._chunks) >= self._MAX_MEMO:
+            self._chunks.clear()
+        self._chunks[chunk] = kinds
+        return kinds
+
+    def parse(self, query: str, entities: Optional[Mapping[str, str]] = None) -> ParsedQuery:
+        """Extract keywords, intents, month, quarter, year and entity in one pass
+
+        ``entities`` maps ``entity_key`` forms of entity (branch) names to
+        their display names; the one mentioned first becomes ``entity``
+        (the longest, when several names start at the same word).
+        """
+        keywords = _NO_KEYWORDS
+        year = entity = None
+        months = quarters = ()
+        previous = previous_value = None
+
+        chunks = self._chunks
+        for chunk in query.split():
+            kinds = chunks.get(chunk)
+            if kinds is None:
+                kinds = self._classify(chunk)
+            if kinds is _ORDINARY:
+                previous = _OTHER
+                continue
+            if kinds.__class__ is frozenset:
+                keywords = keywords | kinds if keywords else kinds
+                previous = _KEYWORD
+                continue
+
+            for kind, value in kinds:
+                if kind == _KEYWORD:
+                    keywords = keywords | value if keywords else value
+                elif kind == _MONTH:
+                    if value not in months:
+                        months += (value,)
+                elif kind == _YEAR:
+                    year = year or value
+                elif kind == _QUARTER:
+                    if value not in quarters:
+                        quarters += (value,)
+                elif kind == _QUARTER_WORD:
+                    keywords = keywords | value if keywords else value
+                    if previous == _ORDINAL and previous_value not in quarters:
+                        quarters += (previous_value,)
+                elif kind == _SHORT_NUMBER and previous == _MONTH:
+                    # "Jan-23" style labels
+                    year = year or 2000 + value
+                elif kind in (_SHORT_NUMBER, _NUMBER) and previous == _QUARTER_WORD and 1 <= value <= 4:
+                    if f"Q{value}" not in quarters:
+                        quarters += (f"Q{value}",)
+                previous, previous_value = kind, value
+
+        if quarters:
+            keywords = keywords | _QUARTER_KEYWORD
+
+        if entities:
+            # Entity names can span several words, so match them on the text
+            padded = f" {' '.join(_TOKEN_RE.findall(query.lower()))} "
+            found = [(position, -len(key), name) for key, name in entities.items()
+                     for position in (padded.find(f" {key} "),) if position >= 0]
+            entity = min(found)[2] if found else None
+
+        plain = self._plain.get(keywords)
+        if plain is None:
+            intents = tuple(intent for intent, words in self.rules if not words.isdisjoint(keywords))
+            if len(self._plain) >= self._MAX_MEMO:
+                self._plain.clear()
+            plain = self._plain[keywords] = ParsedQuery(keywords, intents)
+        if not (months or quarters or year or entity):
+            return plain
+        return ParsedQuery(keywords, plain.intents, months[0] if months else None,
+                           quarters[0] if quarters else None, year, entity, months, quarters)
+
+
+# Quick check of the router
+if __name__ == "__main__":
+    router = QueryRouter([('profit', ['profit']), ('quarter', ['quarter'])], modifiers=['total'])
+    for question in ["What was the profit in May 2023?", "Summarize Q1 2023 performance",
+                     "total profit for the second quarter", "Profit for Jan-23",
+                     "Profit for the North branch in Q2 2024", "compare profit in May and June"]:
+        print(question, "->", router.parse(question, entities={'north': 'North'}))
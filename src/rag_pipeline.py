@@ -1,104 +1,454 @@
+import numpy as np
 import pandas as pd
-import chromadb
-from sentence_transformers import SentenceTransformer
+from business_index import MONTH_NUMBERS, entity_column, parse_periods
+from cache import LRUCache
+from data_loader import iter_business_chunks, load_business_data, resolve_data_path
+from query_router import ParsedQuery, QueryRouter
+from vector_store import VectorBackend, create_backend
+import hashlib
 import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+# Rows read from the CSV at a time, and rows embedded per model call
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_BATCH_SIZE = 256
+
+# Entries kept in the query-embedding and query-result caches
+EMBEDDING_CACHE_SIZE = 1024
+RESULT_CACHE_SIZE = 1024
+
+# Stored with the index and part of every record's content hash; bump it
+# when the stored metadata changes so existing records are rewritten on the
+# next sync, even if the CSV itself is unchanged
+METADATA_VERSION = 2
+
+# Metadata fields rows_to_documents adds to each row's own columns, for filtering
+FILTER_FIELDS = ("period_year", "period_month", "period_quarter", "entity_name")
+
+# Extracts the months, quarters and year a question is filtered to
+_FILTER_ROUTER = QueryRouter([])
+
+# On-disk vector store; set SME_VECTOR_STORE="" for a throwaway in-memory store
+DEFAULT_PERSIST_DIRECTORY = os.environ.get(
+    "SME_VECTOR_STORE", os.path.join(os.path.dirname(__file__), '..', 'data', 'vector_store')
+)
+
+def normalize_query(text: str) -> str:
+    """Case- and whitespace-insensitive form of a question, used as a cache key
+    
+    The embedding model is uncased and ignores extra whitespace, so questions
+    that differ only in those respects have the same embedding.
+    """
+    return " ".join(text.lower().split())
+
+def content_hash(document: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Stable fingerprint of a row's document text, metadata and metadata layout"""
+    fields = json.dumps({key: value for key, value in (metadata or {}).items() if key != "content_hash"},
+                        sort_keys=True, default=str)
+    return hashlib.sha1(f"{METADATA_VERSION}:{document}\n{fields}".encode("utf-8")).hexdigest()
+
+def _as_text(column: pd.Series) -> pd.Series:
+    # Same text an f-string gives for each value
+    return column.astype(str)
+
+def rows_to_documents(df: pd.DataFrame):
+    """Create text chunks, metadata and ids for the rows of ``df``
+    
+    Built column-wise rather than row by row; the text is identical to
+    formatting each row with an f-string. Multi-branch data gets a leading
+    "Branch:" line so searches can tell branches apart.
+    
+    Besides the row's own columns, each record's metadata has the parsed
+    ``period_year``, ``period_month`` (1-12) and ``period_quarter`` and,
+    for multi-branch data, ``entity_name`` - the fields searches are
+    filtered on. Fields that can't be parsed are left out.
+    """
+    sales = df['Sales (INR)']
+    expenses = df['Expenses (INR)']
+    profit = sales - expenses
+    margin = profit / sales * 100
+    
+    documents = (
+        "Month: " + _as_text(df['Month'])
+        + "\nSales: ₹" + _as_text(sales)
+        + "\nExpenses: ₹" + _as_text(expenses)
+        + "\nProfit: ₹" + _as_text(profit)
+        + "\nCustomers: " + _as_text(df['Customers'])
+        + "\nInventory Cost: ₹" + _as_text(df['Inventory Cost (INR)'])
+        + "\nMarketing Spend: ₹" + _as_text(df['Marketing Spend (INR)'])
+        + "\nProfit Margin: " + pd.Series([f"{value:.1f}" for value in margin.tolist()], index=df.index)
+        + "%"
+    )
+    entity = entity_column(df)
+    if entity:
+        documents = "Branch: " + _as_text(df[entity]) + "\n" + documents
+    
+    metadatas = df.to_dict(orient="records")
+    periods = parse_periods(df)
+    for metadata, year, month, quarter in zip(metadatas, periods['year'].tolist(),
+                                              periods['month'].tolist(), periods['quarter'].tolist()):
+        if pd.notna(year):
+            metadata["period_year"] = int(year)
+        if pd.notna(month):
+            metadata["period_month"] = int(month)
+        if quarter:
+            metadata["period_quarter"] = quarter
+    if entity:
+        for metadata, name in zip(metadatas, df[entity].astype(str).str.strip().tolist()):
+            metadata["entity_name"] = name
+    ids = ("record_" + df.index.astype(str)).tolist()
+    
+    return documents.tolist(), metadatas, ids
+
+def metadata_filter(parsed: ParsedQuery) -> Optional[Dict[str, Any]]:
+    """Chroma ``where`` filter for the periods, year and branch a question names
+    
+    Months and quarters are alternatives ("May and Q3" matches either);
+    the year and branch must both match. None when the question names none
+    of them.
+    """
+    conditions = []
+    periods = []
+    if parsed.months:
+        periods.append({"period_month": {"$in": [MONTH_NUMBERS[month] for month in parsed.months]}})
+    if parsed.quarters:
+        periods.append({"period_quarter": {"$in": list(parsed.quarters)}})
+    if periods:
+        conditions.append(periods[0] if len(periods) == 1 else {"$or": periods})
+    if parsed.year:
+        conditions.append({"period_year": parsed.year})
+    if parsed.entity:
+        conditions.append({"entity_name": parsed.entity})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+def question_filter(query_text: str) -> Optional[Dict[str, Any]]:
+    """``metadata_filter`` for the months, quarters and year in a question"""
+    return metadata_filter(_FILTER_ROUTER.parse(query_text))
+
+def _filter_key(where) -> str:
+    return json.dumps(where, sort_keys=True) if where else ""
+
+def _split_results(results, count):
+    """Split a multi-query result into one single-query result per query"""
+    per_query = []
+    for i in range(count):
+        single = {}
+        for key, value in results.items():
+            if key != "included" and isinstance(value, list) and len(value) == count:
+                single[key] = [value[i]]
+            else:
+                single[key] = value
+        per_query.append(single)
+    return per_query
 
 class SMERAGPipeline:
-    def __init__(self, data_path="data/sme_data.csv"):
-        import os
-        # Try multiple possible paths for the CSV file
-        possible_paths = [
-            data_path,
-            os.path.join(os.path.dirname(__file__), '..', 'data', 'sme_data.csv'),
-            os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'sme_data.csv'),
-            '../data/sme_data.csv'
-        ]
+    def __init__(self, data_path="data/sme_data.csv", persist_directory=DEFAULT_PERSIST_DIRECTORY,
+                 backend=None):
+        self.data_path = resolve_data_path(data_path)
         
-        self.data_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                self.data_path = path
-                break
+        # Chroma by default; SME_VECTOR_BACKEND or ``backend`` can pick the NumPy store
+        self.persist_directory = persist_directory or None
+        self.store: VectorBackend = create_backend(backend, self.persist_directory)
+        self._model = None
+        self._model_lock = threading.Lock()
+        # Fast tokenizers aren't safe to call from several threads at once,
+        # and a shared pipeline serves many sessions
+        self._encode_lock = threading.Lock()
         
-        if self.data_path is None:
-            self.data_path = data_path  # Use original path as fallback
+        # Bumped whenever the store or the data changes, so cached results expire
+        self.version = 0
+        # Data file version this pipeline last synced with
+        self._synced_signature = None
+        self.embedding_cache = LRUCache(EMBEDDING_CACHE_SIZE)
+        self.result_cache = LRUCache(RESULT_CACHE_SIZE)
         
-        self.client = chromadb.Client()
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.collection = None
+    @property
+    def model(self):
+        """Embedding model, loaded on first use
+        
+        A warm persistent store that is already in sync never needs it until
+        the first question is embedded.
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer('all-MiniLM-L6-v2')
+        return self._model
+    
+    def _sample_data(self) -> pd.DataFrame:
+        """Sample data used when the CSV file is missing"""
+        return pd.DataFrame({
+            'Month': ['Jan-23', 'Feb-23', 'Mar-23', 'Apr-23', 'May-23', 'Jun-23', 'Jul-23', 'Aug-23', 'Sep-23', 'Oct-23'],
+            'Sales (INR)': [500000, 480000, 520000, 600000, 550000, 450000, 620000, 580000, 610000, 590000],
+            'Expenses (INR)': [300000, 320000, 310000, 340000, 330000, 360000, 350000, 340000, 355000, 345000],
+            'Customers': [200, 190, 210, 250, 230, 180, 260, 240, 255, 245],
+            'Inventory Cost (INR)': [120000, 130000, 125000, 140000, 135000, 145000, 138000, 142000, 140000, 139000],
+            'Marketing Spend (INR)': [30000, 28000, 35000, 40000, 37000, 25000, 42000, 39000, 41000, 38000]
+        })
+    
+    def iter_data_chunks(self, chunksize=DEFAULT_CHUNK_SIZE):
+        """Yield the dataset as DataFrames of at most ``chunksize`` rows
         
+        Slices of the memory-mapped dataset cache when it is current, else
+        chunks streamed from the CSV (see ``iter_business_chunks``).
+        """
+        try:
+            yield from iter_business_chunks(self.data_path, chunksize)
+        except FileNotFoundError:
+            yield self._sample_data()
+    
     def load_and_process_data(self):
         """Load CSV data and create text chunks for embedding"""
         try:
-            df = pd.read_csv(self.data_path)
+            df = load_business_data(self.data_path)
         except FileNotFoundError:
             # Create sample data if file not found
-            df = pd.DataFrame({
-                'Month': ['Jan-23', 'Feb-23', 'Mar-23', 'Apr-23', 'May-23', 'Jun-23', 'Jul-23', 'Aug-23', 'Sep-23', 'Oct-23'],
-                'Sales (INR)': [500000, 480000, 520000, 600000, 550000, 450000, 620000, 580000, 610000, 590000],
-                'Expenses (INR)': [300000, 320000, 310000, 340000, 330000, 360000, 350000, 340000, 355000, 345000],
-                'Customers': [200, 190, 210, 250, 230, 180, 260, 240, 255, 245],
-                'Inventory Cost (INR)': [120000, 130000, 125000, 140000, 135000, 145000, 138000, 142000, 140000, 139000],
-                'Marketing Spend (INR)': [30000, 28000, 35000, 40000, 37000, 25000, 42000, 39000, 41000, 38000]
-            })
-        
-        # Create text representations of each row
-        documents = []
-        metadatas = []
-        ids = []
-        
-        for idx, row in df.iterrows():
-            # Create descriptive text for each row
-            text = f"""Month: {row['Month']}
-Sales: ₹{row['Sales (INR)']}
-Expenses: ₹{row['Expenses (INR)']}
-Profit: ₹{row['Sales (INR)'] - row['Expenses (INR)']}
-Customers: {row['Customers']}
-Inventory Cost: ₹{row['Inventory Cost (INR)']}
-Marketing Spend: ₹{row['Marketing Spend (INR)']}
-Profit Margin: {((row['Sales (INR)'] - row['Expenses (INR)']) / row['Sales (INR)'] * 100):.1f}%"""
-            
-            documents.append(text)
-            metadatas.append(row.to_dict())
-            ids.append(f"record_{idx}")
-        
-        return documents, metadatas, ids
-    
-    def create_vector_store(self):
-        """Create ChromaDB collection and embed documents"""
-        documents, metadatas, ids = self.load_and_process_data()
-        
-        # Create or get collection
-        self.collection = self.client.get_or_create_collection(
-            name="sme_business_data"
-        )
+            df = self._sample_data()
+        
+        return rows_to_documents(df)
+    
+    def source_signature(self) -> str:
+        """Identify the current CSV contents by path, size and modification time"""
+        try:
+            stat = os.stat(self.data_path)
+        except OSError:
+            return ""
+        return f"{os.path.abspath(self.data_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    
+    def create_vector_store(self, chunksize=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+        """Create or incrementally update the vector store
+        
+        The CSV is streamed in ``chunksize``-row chunks and embedded in
+        ``batch_size`` batches that are written to the store as they are
+        produced, so peak memory is bounded by one chunk plus one batch of
+        float32 embeddings regardless of the file size.
+        
+        Each record carries a hash of its text and metadata; only rows that
+        are new or changed are embedded, and rows no longer in the CSV are
+        removed.
+        When the CSV is unchanged since the last sync, and the index was built
+        with the current ``METADATA_VERSION``, the stored index is used as-is
+        without reading the file. Returns the number of records embedded.
+        """
+        signature = self.source_signature()
+        store_metadata = self.store.metadata
+        if signature and self._in_sync(store_metadata, signature) and self.store.count():
+            # Another process may have synced it to a newer file than this one had
+            self._synced(signature, changed=False)
+            print(f"✅ Vector store up to date ({self.store.count()} records)")
+            return 0
+        
+        total_rows = embedded = 0
+        for chunk in self.iter_data_chunks(chunksize):
+            for start in range(0, len(chunk), batch_size):
+                documents, metadatas, ids = rows_to_documents(chunk.iloc[start:start + batch_size])
+                embedded += self._upsert_changed(documents, metadatas, ids)
+                total_rows += len(ids)
+            print(f"  📦 {total_rows:,} rows processed, {embedded:,} embedded")
+        
+        # Records are numbered by row, so anything at or past the row count is stale
+        stale = [
+            record_id for record_id in self.store.ids()
+            if not record_id.startswith("record_") or int(record_id[len("record_"):]) >= total_rows
+        ]
+        if stale:
+            self.store.delete(stale)
+        
+        if signature:
+            self.store.set_metadata({**store_metadata, "source_signature": signature,
+                                     "metadata_version": METADATA_VERSION})
+        self.store.flush()
+        self._synced(signature, changed=bool(embedded or stale))
+        
+        print(f"✅ Vector store synced: {embedded} embedded, {total_rows - embedded} unchanged, {len(stale)} removed")
+        return embedded
+    
+    @property
+    def synced_signature(self) -> Optional[str]:
+        """``source_signature()`` of the file version this pipeline last synced with"""
+        return self._synced_signature
+    
+    @staticmethod
+    def _in_sync(store_metadata: Dict[str, Any], signature: str) -> bool:
+        """Whether the stored index was built from ``signature`` with the current metadata layout"""
+        return (store_metadata.get("source_signature") == signature
+                and store_metadata.get("metadata_version") == METADATA_VERSION)
+    
+    def _synced(self, signature: str, changed: bool):
+        """Record a sync with the ``signature`` version of the file
+        
+        Cached results expire when the store changed or the file did since
+        the last sync - a store already updated by another process changes
+        nothing here, yet its search results are new.
+        """
+        if changed or signature != self._synced_signature:
+            self.version += 1
+        self._synced_signature = signature
+    
+    def add_rows(self, rows: pd.DataFrame, start: int, previous_signature: str,
+                 batch_size=DEFAULT_BATCH_SIZE) -> int:
+        """Embed rows just appended to the CSV, numbered from row ``start``
+        
+        ``previous_signature`` is the CSV's ``source_signature()`` from before
+        the append. If the store wasn't in sync with that version of the
+        file, this falls back to a full ``create_vector_store`` sync instead.
+        Returns the number of records embedded.
+        """
+        store_metadata = self.store.metadata
+        if not previous_signature or not self._in_sync(store_metadata, previous_signature):
+            return self.create_vector_store(batch_size=batch_size)
+        
+        rows = rows.set_axis(pd.RangeIndex(start, start + len(rows)))
+        embedded = 0
+        for offset in range(0, len(rows), batch_size):
+            embedded += self._upsert_changed(*rows_to_documents(rows.iloc[offset:offset + batch_size]))
+        
+        signature = self.source_signature()
+        self.store.set_metadata({**store_metadata, "source_signature": signature,
+                                 "metadata_version": METADATA_VERSION})
+        self.store.flush()
+        self._synced(signature, changed=bool(embedded))
+        print(f"✅ Vector store updated: {embedded} appended rows embedded")
+        return embedded
+    
+    def _upsert_changed(self, documents, metadatas, ids) -> int:
+        """Embed and write the records of one batch whose content changed"""
+        hashes = [content_hash(document, metadata) for document, metadata in zip(documents, metadatas)]
+        for metadata, digest in zip(metadatas, hashes):
+            metadata["content_hash"] = digest
         
-        # Generate embeddings
-        embeddings = self.model.encode(documents).tolist()
+        stored_hashes = {
+            record_id: metadata.get("content_hash")
+            for record_id, metadata in self.store.get_metadatas(ids).items()
+        }
+        changed = [i for i, record_id in enumerate(ids) if stored_hashes.get(record_id) != hashes[i]]
+        if not changed:
+            return 0
         
-        # Add to ChromaDB
-        self.collection.add(
+        model = self.model
+        with self._encode_lock:
+            embeddings = model.encode(
+                [documents[i] for i in changed], batch_size=len(changed), convert_to_numpy=True
+            ).astype(np.float32, copy=False)
+        self.store.upsert(
+            ids=[ids[i] for i in changed],
             embeddings=embeddings,
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
+            documents=[documents[i] for i in changed],
+            metadatas=[metadatas[i] for i in changed],
         )
+        return len(changed)
+    
+    def embed_query(self, query_text: str) -> np.ndarray:
+        """Embed a question, reusing the cached embedding for repeated questions"""
+        return self.embed_queries([query_text])[0]
+    
+    def embed_queries(self, query_texts) -> np.ndarray:
+        """Embed several questions; uncached ones are encoded in a single model call"""
+        keys = [normalize_query(text) for text in query_texts]
+        embeddings = {}
+        missing = []
+        for key in keys:
+            if key in embeddings:
+                continue
+            embedding = self.embedding_cache.get(key)
+            if embedding is None:
+                missing.append(key)
+            embeddings[key] = embedding
+        
+        if missing:
+            model = self.model
+            with self._encode_lock:
+                encoded = model.encode(missing, convert_to_numpy=True).astype(np.float32, copy=False)
+            for key, embedding in zip(missing, encoded):
+                embeddings[key] = embedding
+                self.embedding_cache.put(key, embedding)
         
-        print(f"✅ Added {len(documents)} records to vector store")
+        return np.stack([embeddings[key] for key in keys])
     
-    def query(self, query_text, n_results=3):
-        """Query the vector store"""
-        if not self.collection:
-            self.collection = self.client.get_collection("sme_business_data")
+    def _search(self, embeddings, n_results, where):
+        """One result per embedding among the records matching ``where``
         
-        query_embedding = self.model.encode([query_text]).tolist()
+        Questions whose filter matches no records are searched again
+        without it, so a filter never leaves a question unanswered.
+        """
+        if not where:
+            return _split_results(self.store.query(embeddings, n_results), len(embeddings))
+        results = _split_results(self.store.query(embeddings, n_results, where=where), len(embeddings))
+        empty = [i for i, single in enumerate(results) if not single["ids"] or not single["ids"][0]]
+        if empty:
+            for i, single in zip(empty, self._search(embeddings[empty], n_results, None)):
+                results[i] = single
+        return results
+    
+    def query(self, query_text, n_results=3, where=None):
+        """Query the vector store
         
-        results = self.collection.query(
-            query_embeddings=query_embedding,
-            n_results=n_results
-        )
+        The search is limited to records matching ``where``, a Chroma-style
+        metadata filter; by default it is ``question_filter(query_text)``
+        (the months, quarters and year the question names), and ``{}``
+        searches everything. Results are cached per (question, n_results,
+        filter, store version); callers must treat the returned dict as
+        read-only.
+        """
+        if where is None:
+            where = question_filter(query_text)
+        result_key = (normalize_query(query_text), n_results, _filter_key(where), self.version)
+        results = self.result_cache.get(result_key)
+        if results is not None:
+            return results
+        
+        query_embedding = self.embed_query(query_text)
+        
+        results = self._search(query_embedding[np.newaxis], n_results, where)[0]
+        
+        self.result_cache.put(result_key, results)
+        return results
+    
+    def query_batch(self, query_texts, n_results=3, wheres=None):
+        """Query the vector store for many questions at once
+        
+        Uncached questions are embedded in one model call and searched with
+        one store query per distinct filter. ``wheres`` gives each
+        question's filter as in ``query``. Returns one result dict per
+        question, in input order, shaped like the result of ``query``.
+        """
+        if wheres is None:
+            wheres = [None] * len(query_texts)
+        wheres = [question_filter(text) if where is None else where for text, where in zip(query_texts, wheres)]
+        keys = [(normalize_query(text), n_results, _filter_key(where), self.version)
+                for text, where in zip(query_texts, wheres)]
+        results = [self.result_cache.get(key) for key in keys]
+        
+        pending = {}
+        filters = {}
+        for i, (key, cached) in enumerate(zip(keys, results)):
+            if cached is None:
+                pending.setdefault(key, []).append(i)
+                filters[key[2]] = wheres[i]
+        
+        if pending:
+            pending_keys = list(pending)
+            embeddings = self.embed_queries([key[0] for key in pending_keys])
+            for filter_key, where in filters.items():
+                group = [j for j, key in enumerate(pending_keys) if key[2] == filter_key]
+                for j, single in zip(group, self._search(embeddings[group], n_results, where)):
+                    self.result_cache.put(pending_keys[j], single)
+                    for i in pending[pending_keys[j]]:
+                        results[i] = single
         
         return results
+    
+    def cache_stats(self):
+        """Hit/miss counters of the embedding and result caches"""
+        return {
+            "embeddings": self.embedding_cache.stats(),
+            "results": self.result_cache.stats(),
+        }
 
 # Test the RAG pipeline
 if __name__ == "__main__":
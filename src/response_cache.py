@@ -0,0 +1,87 @@
+"""
+Cache of answers to routed questions
+
+Tool-based answers are a function of what the query router extracted from
+a question - intents, keywords, month, quarter, year, entity - and of the
+data they were computed from. Keying on those instead of the raw text lets
+"profit in May" and "What was the profit in May 2023?" share one entry
+(when May 2023 is the latest May), and keying on the dataset version means
+an append or reload never serves a stale answer.
+"""
+import os
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from business_index import BusinessIndex
+from cache import LRUCache
+from query_router import ParsedQuery
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("SME_RESPONSE_CACHE_SIZE", 1024))
+# Seconds an answer may be served for; 0 disables expiry
+RESPONSE_CACHE_TTL = float(os.environ.get("SME_RESPONSE_CACHE_TTL", 600))
+
+
+def question_scope(parsed: ParsedQuery, index: BusinessIndex) -> Tuple[Hashable, ...]:
+    """The periods, year and entity a routed question is about
+
+    Each month or quarter comes with the year it resolves to.
+    """
+    entity = index.resolve_entity(parsed.entity)
+    periods = []
+    for month in parsed.months:
+        key = index.month_key(month, parsed.year, entity)
+        periods.append((month, parsed.year if key is None else key[1]))
+    for quarter in parsed.quarters:
+        periods.append((quarter, parsed.year or index.latest_year(entity, quarter)))
+    # A question without periods may still name a year
+    year = None if periods else parsed.year
+    return (tuple(periods), year, entity)
+
+
+def response_key(parsed: ParsedQuery, index: BusinessIndex) -> Tuple[Hashable, ...]:
+    """Cache key for a routed question: its intents and keywords plus its scope"""
+    return (parsed.intents, parsed.keywords) + question_scope(parsed, index)
+
+
+class ResponseCache:
+    """LRU/TTL cache of answers that belong to one dataset version
+
+    The first lookup with a newer version drops every entry of the older
+    one; lookups from a snapshot older than the current version miss and
+    are not stored.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: Optional[float] = RESPONSE_CACHE_TTL):
+        self.entries = LRUCache(maxsize, ttl or None)
+        self.version: Optional[int] = None
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _current(self, version: int) -> bool:
+        """Move to ``version`` if it is newer; False if it is older than the current one"""
+        if version != self.version:
+            with self._lock:
+                if self.version is None or version > self.version:
+                    if self.version is not None:
+                        self.invalidations += 1
+                    self.entries.clear()
+                    self.version = version
+        return version == self.version
+
+    def get(self, key: Hashable, version: int) -> Optional[str]:
+        if not self._current(version):
+            return None
+        # The version is part of the key, so an entry stored just before a
+        # newer version cleared the cache can never be served for it
+        return self.entries.get((version, key))
+
+    def put(self, key: Hashable, version: int, answer: str):
+        if self._current(version):
+            self.entries.put((version, key), answer)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and size of the cache, plus the dataset version it holds"""
+        return dict(self.entries.stats(), version=self.version, invalidations=self.invalidations)
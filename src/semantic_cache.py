@@ -0,0 +1,162 @@
+"""
+Semantic answer cache keyed on question embeddings
+
+Users ask the same thing many ways ("May profit", "how much did we make in
+May?"). ``SemanticCache`` stores the final answer under the question's
+embedding and serves it to any later question whose embedding is within
+a cosine-similarity threshold, skipping the search and LLM generation.
+
+Embeddings barely separate "profit in May" from "profit in June", or
+"sales in May" from "expenses in May", so an entry is only a candidate
+for questions with the same ``scope`` - the periods, year and entity the
+query router extracted - and, when both questions have a ``topic`` (the
+metric keywords the router found), the same topic. A paraphrase without
+one ("how much did we make in May?") can still match "May profit".
+"""
+import os
+import threading
+from collections import deque
+from typing import AbstractSet, Any, Dict, Hashable, NamedTuple, Optional
+
+import numpy as np
+
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SME_SEMANTIC_CACHE_THRESHOLD", 0.85))
+SEMANTIC_CACHE_SIZE = int(os.environ.get("SME_SEMANTIC_CACHE_SIZE", 2048))
+
+
+class SemanticMatch(NamedTuple):
+    """A cached answer and how close its question was to the one asked"""
+    answer: str
+    similarity: float
+    question: Optional[str]
+
+
+class SemanticCache:
+    """Fixed-size store of (question embedding, scope) -> answer for one dataset version
+
+    Embeddings are kept as unit rows of a preallocated float32 matrix, so a
+    lookup is one matrix-vector product over the entries of the same scope.
+    When full, the oldest entry is replaced. As with ``ResponseCache``, a
+    newer dataset version drops every entry and an older one neither hits
+    nor stores.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, maxsize: int = SEMANTIC_CACHE_SIZE):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._similarity_total = 0.0
+        self._matrix: Optional[np.ndarray] = None
+        # Scope id per slot, -1 for empty slots
+        self._scopes = np.full(maxsize, -1, dtype=np.int64)
+        self._scope_ids: Dict[Hashable, int] = {}
+        self._answers = [None] * maxsize
+        self._questions = [None] * maxsize
+        self._topics = [frozenset()] * maxsize
+        self._next = 0
+        # (question asked, cached question it matched, similarity) of recent
+        # hits, for checking that the threshold only joins true paraphrases
+        self.recent_hits = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    def _current(self, version: int) -> bool:
+        """Move to ``version`` if it is newer; False if it is older. Call with the lock held."""
+        if self.version is None or version > self.version:
+            if self.version is not None:
+                self.invalidations += 1
+            self._clear()
+            self.version = version
+        return version == self.version
+
+    def _clear(self):
+        self._scopes.fill(-1)
+        self._scope_ids.clear()
+        self._answers = [None] * self.maxsize
+        self._questions = [None] * self.maxsize
+        self._topics = [frozenset()] * self.maxsize
+        self._next = 0
+
+    @staticmethod
+    def _unit(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, embedding, version: int, scope: Hashable = None,
+               question: Optional[str] = None, topic: AbstractSet[str] = frozenset()) -> Optional[SemanticMatch]:
+        """Closest cached answer in ``scope`` within the threshold, or None
+
+        With a ``topic``, entries stored with a different non-empty topic
+        are skipped.
+        """
+        vector = self._unit(embedding)
+        with self._lock:
+            current = self._current(version)
+            scope_id = self._scope_ids.get(scope)
+            if not current or scope_id is None or self._matrix is None:
+                self.misses += 1
+                return None
+            slots = np.flatnonzero(self._scopes == scope_id)
+            if topic:
+                slots = slots[[not self._topics[slot] or self._topics[slot] == topic for slot in slots]]
+            if not len(slots):
+                self.misses += 1
+                return None
+            similarities = self._matrix[slots] @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._similarity_total += similarity
+            slot = slots[best]
+            self.recent_hits.append((question, self._questions[slot], round(similarity, 4)))
+            return SemanticMatch(self._answers[slot], similarity, self._questions[slot])
+
+    def get(self, embedding, version: int, scope: Hashable = None, question: Optional[str] = None,
+            topic: AbstractSet[str] = frozenset()) -> Optional[str]:
+        match = self.lookup(embedding, version, scope, question, topic)
+        return None if match is None else match.answer
+
+    def put(self, embedding, version: int, answer: str, scope: Hashable = None, question: Optional[str] = None,
+            topic: AbstractSet[str] = frozenset()):
+        vector = self._unit(embedding)
+        with self._lock:
+            if not self._current(version):
+                return
+            if self._matrix is None:
+                self._matrix = np.zeros((self.maxsize, len(vector)), dtype=np.float32)
+            slot = self._next
+            self._next = (slot + 1) % self.maxsize
+            self._matrix[slot] = vector
+            self._scopes[slot] = self._scope_ids.setdefault(scope, len(self._scope_ids))
+            self._answers[slot] = answer
+            self._questions[slot] = question
+            self._topics[slot] = frozenset(topic)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+            self.recent_hits.clear()
+
+    def __len__(self) -> int:
+        return int((self._scopes >= 0).sum())
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, mean similarity of hits and size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "mean_hit_similarity": round(self._similarity_total / self.hits, 4) if self.hits else None,
+            "threshold": self.threshold,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "version": self.version,
+            "invalidations": self.invalidations,
+        }
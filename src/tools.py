@@ -1,28 +1,26 @@
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional
+from business_index import BusinessIndex
+from business_stats import DatasetStats
+from data_loader import load_business_data, resolve_data_path
+from dataset import BusinessDataset, add_derived_columns
 
 class BusinessAnalysisTools:
     def __init__(self, data_path="data/sme_data.csv"):
-        # Try multiple possible paths for the CSV file
-        import os
-        possible_paths = [
-            data_path,
-            os.path.join(os.path.dirname(__file__), '..', 'data', 'sme_data.csv'),
-            os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'sme_data.csv'),
-            '../data/sme_data.csv'
-        ]
-        
-        self.df = None
-        for path in possible_paths:
-            try:
-                self.df = pd.read_csv(path)
-                break
-            except FileNotFoundError:
-                continue
+        self.data_path = resolve_data_path(data_path)
+        self.reload()
+    
+    def reload(self) -> int:
+        """Load the data file again and swap in a fresh dataset; returns its version"""
+        df = None
+        try:
+            df = load_business_data(self.data_path)
+        except FileNotFoundError:
+            pass
         
-        if self.df is None:
+        if df is None:
             # Create sample data if file not found
-            self.df = pd.DataFrame({
+            df = pd.DataFrame({
                 'Month': ['Jan-23', 'Feb-23', 'Mar-23', 'Apr-23', 'May-23', 'Jun-23', 'Jul-23', 'Aug-23', 'Sep-23', 'Oct-23'],
                 'Sales (INR)': [500000, 480000, 520000, 600000, 550000, 450000, 620000, 580000, 610000, 590000],
                 'Expenses (INR)': [300000, 320000, 310000, 340000, 330000, 360000, 350000, 340000, 355000, 345000],
@@ -31,70 +29,92 @@ class BusinessAnalysisTools:
                 'Marketing Spend (INR)': [30000, 28000, 35000, 40000, 37000, 25000, 42000, 39000, 41000, 38000]
             })
         
-        self.df['Profit'] = self.df['Sales (INR)'] - self.df['Expenses (INR)']
-        self.df['Profit Margin %'] = (self.df['Profit'] / self.df['Sales (INR)']) * 100
+        self.dataset = BusinessDataset(df, prepare=add_derived_columns)
+        return self.dataset.version
+    
+    @property
+    def df(self) -> pd.DataFrame:
+        return self.dataset.df
+    
+    @property
+    def index(self) -> BusinessIndex:
+        return self.dataset.index
+    
+    @property
+    def stats(self) -> DatasetStats:
+        return self.dataset.stats
+    
+    def add_rows(self, rows: pd.DataFrame) -> int:
+        """Fold newly appended rows into the data, index and totals; returns the new dataset version"""
+        self.dataset = self.dataset.append(rows)
+        return self.dataset.version
+    
+    def _with_entity(self, result: Dict, entity: Optional[str]) -> Dict:
+        if entity is not None:
+            result["entity"] = self.index.resolve_entity(entity)
+        return result
     
-    def get_monthly_profit(self, month: str) -> Dict:
-        """Get profit for a specific month"""
-        row = self.df[self.df['Month'].str.contains(month, case=False)]
-        if not row.empty:
-            row = row.iloc[0]
-            return {
-                "month": row['Month'],
-                "sales": row['Sales (INR)'],
-                "expenses": row['Expenses (INR)'],
-                "profit": row['Profit'],
-                "profit_margin": round(row['Profit Margin %'], 2)
-            }
+    def get_monthly_profit(self, month: str, year: Optional[int] = None, entity: Optional[str] = None) -> Dict:
+        """Get profit for a specific month (all branches combined unless ``entity`` is given)"""
+        totals = self.index.month(month, year, entity)
+        if totals is not None:
+            return self._with_entity({
+                "month": totals['Month'],
+                "sales": totals['Sales (INR)'],
+                "expenses": totals['Expenses (INR)'],
+                "profit": totals['Profit'],
+                "profit_margin": round(totals['Profit'] / totals['Sales (INR)'] * 100, 2)
+            }, entity)
         return {"error": "Month not found"}
     
-    def get_quarterly_summary(self, quarter: str) -> Dict:
-        """Get quarterly business summary"""
-        if quarter.upper() == "Q1":
-            months = ["Jan-23", "Feb-23", "Mar-23"]
-        elif quarter.upper() == "Q2":
-            months = ["Apr-23", "May-23", "Jun-23"]
-        elif quarter.upper() == "Q3":
-            months = ["Jul-23", "Aug-23", "Sep-23"]
-        elif quarter.upper() == "Q4":
-            months = ["Oct-23", "Nov-23", "Dec-23"]
-        else:
+    def get_quarterly_summary(self, quarter: str, year: Optional[int] = None, entity: Optional[str] = None) -> Dict:
+        """Get quarterly business summary (defaults to the most recent year)"""
+        if quarter.upper() not in ("Q1", "Q2", "Q3", "Q4"):
             return {"error": "Invalid quarter"}
         
-        q_data = self.df[self.df['Month'].isin(months)]
+        totals = self.index.quarter(quarter, year, entity)
+        if totals is None:
+            return {"error": "No data for this quarter"}
         
-        return {
+        return self._with_entity({
             "quarter": quarter.upper(),
-            "total_sales": q_data['Sales (INR)'].sum(),
-            "total_expenses": q_data['Expenses (INR)'].sum(),
-            "total_profit": q_data['Profit'].sum(),
-            "avg_customers": round(q_data['Customers'].mean()),
-            "avg_profit_margin": round(q_data['Profit Margin %'].mean(), 2)
-        }
+            "year": totals['Year'],
+            "total_sales": totals['Sales (INR)'],
+            "total_expenses": totals['Expenses (INR)'],
+            "total_profit": totals['Profit'],
+            "avg_customers": round(totals['Customers'] / totals['count']),
+            "avg_profit_margin": round(totals['Profit Margin %'] / totals['count'], 2)
+        }, entity)
     
-    def suggest_cost_optimization(self, month: str) -> List[str]:
+    def suggest_cost_optimization(self, month: str, year: Optional[int] = None, entity: Optional[str] = None) -> List[str]:
         """Suggest cost optimization strategies"""
-        row = self.df[self.df['Month'].str.contains(month, case=False)]
-        if row.empty:
+        # One snapshot throughout, so the index and its stats always match
+        dataset = self.dataset
+        index = dataset.index
+        totals = index.month(month, year, entity)
+        if totals is None:
             return ["Month not found"]
         
-        row = row.iloc[0]
         suggestions = []
+        # Compare against the same entity's (or the combined) monthly
+        # figures, averaged once per dataset version
+        averages = dataset.stats.month_averages(index, entity)
         
         # Check inventory costs
-        avg_inventory = self.df['Inventory Cost (INR)'].mean()
-        if row['Inventory Cost (INR)'] > avg_inventory:
-            suggestions.append(f"Reduce inventory costs from ₹{row['Inventory Cost (INR)']} (₹{row['Inventory Cost (INR)'] - avg_inventory:.0f} above average)")
+        inventory = totals['Inventory Cost (INR)']
+        avg_inventory = averages['inventory_cost']
+        if inventory > avg_inventory:
+            suggestions.append(f"Reduce inventory costs from ₹{inventory} (₹{inventory - avg_inventory:.0f} above average)")
         
         # Check marketing efficiency
-        marketing_roi = row['Customers'] / (row['Marketing Spend (INR)'] / 1000)
-        avg_roi = (self.df['Customers'] / (self.df['Marketing Spend (INR)'] / 1000)).mean()
+        marketing_roi = totals['Customers'] / (totals['Marketing Spend (INR)'] / 1000)
+        avg_roi = averages['marketing_roi']
         
         if marketing_roi < avg_roi:
             suggestions.append(f"Improve marketing efficiency - current ROI: {marketing_roi:.2f} customers per ₹1000 spent")
         
         # Check profit margin
-        if row['Profit Margin %'] < 30:
+        if totals['Profit'] / totals['Sales (INR)'] * 100 < 30:
             suggestions.append("Consider raising prices or reducing operational costs to improve profit margin")
         
         return suggestions if suggestions else ["Business performance is optimal for this month"]
@@ -0,0 +1,352 @@
+"""
+Vector store backends for the RAG pipeline
+
+``SMERAGPipeline`` talks to its store only through ``VectorBackend``, so
+the store can be swapped without touching the pipeline:
+
+- ``ChromaBackend``: a ChromaDB collection (the default)
+- ``NumpyBackend``: an in-process float32 matrix searched with one
+  matrix-vector product, persisted as ``.npy`` files and reopened with
+  mmap. For this dataset's sizes it avoids Chroma's import cost, memory
+  and per-query overhead.
+
+``SME_VECTOR_BACKEND`` picks one: "chroma" or "numpy".
+"""
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+VECTOR_BACKEND = os.environ.get("SME_VECTOR_BACKEND", "chroma").lower()
+COLLECTION_NAME = "sme_business_data"
+
+# Packages each backend needs besides numpy
+BACKEND_PACKAGES = {"chroma": ["chromadb"], "numpy": []}
+
+
+def _json_value(value):
+    # NumPy scalars that older pandas leaves in ``to_dict`` records
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+class VectorBackend(ABC):
+    """Records of (id, embedding, document, metadata) plus store-level metadata
+
+    ``query`` returns results shaped like a Chroma query: ``ids``,
+    ``documents``, ``metadatas`` and ``distances``, each a list with one
+    list per query embedding, best match first. Its ``where`` filter on
+    record metadata uses Chroma's syntax: ``{field: value}``,
+    ``{field: {"$eq" | "$ne" | "$in" | "$nin": ...}}`` and ``"$and"`` /
+    ``"$or"`` lists of filters.
+    """
+
+    @property
+    @abstractmethod
+    def metadata(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_metadata(self, metadata: Dict[str, Any]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def ids(self) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_metadatas(self, ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Metadata of the records among ``ids`` that exist"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert(self, ids: Sequence[str], embeddings: np.ndarray, documents: Sequence[str],
+               metadatas: Sequence[Dict[str, Any]]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, ids: Sequence[str]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def query(self, embeddings, n_results: int, where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def flush(self):
+        """Persist pending changes (stores that write through need not)"""
+
+
+class ChromaBackend(VectorBackend):
+    """A ChromaDB collection, on disk under ``directory`` or in memory without one"""
+
+    def __init__(self, directory: Optional[str] = None, name: str = COLLECTION_NAME):
+        # Heavy dependency, imported only once a store is actually opened
+        import chromadb
+
+        self.client = chromadb.PersistentClient(path=directory) if directory else chromadb.Client()
+        self.collection = self.client.get_or_create_collection(name=name)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.collection.metadata or {}
+
+    def set_metadata(self, metadata: Dict[str, Any]):
+        self.collection.modify(metadata=metadata)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def ids(self) -> List[str]:
+        return self.collection.get(include=[])["ids"]
+
+    def get_metadatas(self, ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        stored = self.collection.get(ids=list(ids), include=["metadatas"])
+        return {record_id: metadata or {} for record_id, metadata in zip(stored["ids"], stored["metadatas"])}
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(ids=list(ids), embeddings=embeddings, documents=list(documents),
+                               metadatas=list(metadatas))
+
+    def delete(self, ids):
+        self.collection.delete(ids=list(ids))
+
+    def query(self, embeddings, n_results: int, where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Chroma rejects an empty filter, so leave it out entirely
+        options = {"where": where} if where else {}
+        return self.collection.query(query_embeddings=embeddings, n_results=n_results, **options)
+
+
+class NumpyBackend(VectorBackend):
+    """In-process store: unit-length float32 rows searched by dot product
+
+    Embeddings live in one contiguous matrix that grows by doubling; a
+    query scores every row with one matrix product and picks the top
+    ``n_results`` with ``argpartition``. Distances are squared L2 between
+    unit vectors (``2 - 2 * cosine``), Chroma's default metric, so results
+    rank and read the same as from ``ChromaBackend``.
+
+    With a ``directory`` the store is saved there by ``flush`` and the
+    matrix is reopened memory-mapped, so processes sharing a store share
+    its pages; it is copied into memory on the first write.
+
+    A ``where`` filter is evaluated on per-field metadata columns built on
+    first use, and only the matching rows are scored.
+    """
+
+    _RECORDS_FILE = "records.json"
+
+    def __init__(self, directory: Optional[str] = None, mmap: bool = True):
+        self.directory = directory
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._metadata: Dict[str, Any] = {}
+        # Metadata field -> array of its value per row, rebuilt after writes
+        self._columns: Dict[str, np.ndarray] = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+        if directory:
+            self._load(mmap)
+
+    def _load(self, mmap: bool):
+        try:
+            with open(os.path.join(self.directory, self._RECORDS_FILE), encoding="utf-8") as f:
+                records = json.load(f)
+            matrix = np.load(os.path.join(self.directory, records["matrix"]), mmap_mode="r" if mmap else None)
+        except (OSError, ValueError, KeyError):
+            # Missing or unreadable: start empty and let the pipeline rebuild
+            return
+        if matrix.ndim != 2 or len(matrix) != len(records["ids"]):
+            return
+        self._matrix = matrix
+        self._size = len(matrix)
+        self._ids = records["ids"]
+        self._rows = {record_id: row for row, record_id in enumerate(self._ids)}
+        self._documents = records["documents"]
+        self._metadatas = records["metadatas"]
+        self._metadata = records["metadata"]
+
+    def flush(self):
+        if not self.directory or not self._dirty:
+            return
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            # Each save writes a new matrix file and then swaps in the records
+            # naming it, so a reader - or a crash - never pairs the records
+            # of one save with the matrix of another
+            matrix_file = f"embeddings-{time.time_ns()}.npy"
+            records_path = os.path.join(self.directory, self._RECORDS_FILE)
+            np.save(os.path.join(self.directory, matrix_file), np.ascontiguousarray(self._matrix[:self._size]))
+            with open(records_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"matrix": matrix_file, "ids": self._ids, "documents": self._documents,
+                           "metadatas": self._metadatas, "metadata": self._metadata}, f, default=_json_value)
+            os.replace(records_path + ".tmp", records_path)
+            # Processes that still map an old matrix keep it until they close it
+            for name in os.listdir(self.directory):
+                if name.startswith("embeddings-") and name != matrix_file:
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        # Windows won't remove a mapped file; the next flush retries
+                        pass
+            self._dirty = False
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return dict(self._metadata)
+
+    def set_metadata(self, metadata: Dict[str, Any]):
+        with self._lock:
+            self._metadata = dict(metadata)
+            self._dirty = True
+
+    def count(self) -> int:
+        return self._size
+
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    def get_metadatas(self, ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {record_id: self._metadatas[self._rows[record_id]] for record_id in ids if record_id in self._rows}
+
+    @staticmethod
+    def _unit_rows(embeddings) -> np.ndarray:
+        matrix = np.array(embeddings, dtype=np.float32, ndmin=2)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return matrix / norms
+
+    def _reserve(self, rows: int, dimensions: int):
+        """Make room for ``rows`` rows in a writable (not memory-mapped) matrix"""
+        capacity = len(self._matrix)
+        if rows <= capacity and self._matrix.flags.writeable:
+            return
+        if rows > capacity:
+            capacity = max(rows, 2 * capacity, 1024)
+        matrix = np.zeros((capacity, dimensions), dtype=np.float32)
+        if self._size:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        vectors = self._unit_rows(embeddings)
+        with self._lock:
+            new = [record_id for record_id in dict.fromkeys(ids) if record_id not in self._rows]
+            self._reserve(self._size + len(new), vectors.shape[1])
+            for record_id in new:
+                self._rows[record_id] = len(self._ids)
+                self._ids.append(record_id)
+                self._documents.append(None)
+                self._metadatas.append(None)
+            self._size = len(self._ids)
+            rows = [self._rows[record_id] for record_id in ids]
+            self._matrix[rows] = vectors
+            for row, document, metadata in zip(rows, documents, metadatas):
+                self._documents[row] = document
+                self._metadatas[row] = dict(metadata)
+            self._columns.clear()
+            self._dirty = True
+
+    def delete(self, ids):
+        with self._lock:
+            doomed = [record_id for record_id in ids if record_id in self._rows]
+            if not doomed:
+                return
+            self._reserve(self._size, self._matrix.shape[1])
+            for record_id in doomed:
+                # Move the last record into the freed row
+                row = self._rows.pop(record_id)
+                last = self._size - 1
+                if row != last:
+                    moved = self._ids[last]
+                    self._matrix[row] = self._matrix[last]
+                    self._ids[row] = moved
+                    self._documents[row] = self._documents[last]
+                    self._metadatas[row] = self._metadatas[last]
+                    self._rows[moved] = row
+                del self._ids[last], self._documents[last], self._metadatas[last]
+                self._size = last
+            self._columns.clear()
+            self._dirty = True
+
+    def _column(self, field: str) -> np.ndarray:
+        """Value of ``field`` for every row (None where missing). Call with the lock held."""
+        column = self._columns.get(field)
+        if column is None:
+            column = np.empty(self._size, dtype=object)
+            column[:] = [metadata.get(field) for metadata in self._metadatas]
+            self._columns[field] = column
+        return column
+
+    def _mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """Rows matching a Chroma-style ``where`` filter. Call with the lock held."""
+        masks = []
+        for field, condition in where.items():
+            if field in ("$and", "$or"):
+                parts = [self._mask(part) for part in condition]
+                combine = np.logical_and if field == "$and" else np.logical_or
+                masks.append(combine.reduce(parts) if parts else np.full(self._size, field == "$and"))
+                continue
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            column = self._column(field)
+            for operator, value in condition.items():
+                if operator in ("$eq", "$ne"):
+                    mask = column == value
+                elif operator in ("$in", "$nin"):
+                    mask = np.zeros(self._size, dtype=bool)
+                    for item in value:
+                        mask |= column == item
+                else:
+                    raise ValueError(f"Unsupported filter operator: {operator}")
+                masks.append(~mask if operator in ("$ne", "$nin") else mask)
+        return np.logical_and.reduce(masks) if masks else np.ones(self._size, dtype=bool)
+
+    def query(self, embeddings, n_results: int, where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        queries = self._unit_rows(embeddings)
+        with self._lock:
+            rows = np.flatnonzero(self._mask(where)) if where and self._size else np.arange(self._size)
+            if len(rows) == self._size:
+                candidates = self._matrix[:self._size]
+            else:
+                candidates = self._matrix[rows]
+            scores = queries @ candidates.T if len(rows) else np.zeros((len(queries), 0), dtype=np.float32)
+            ids, documents, metadatas = self._ids, self._documents, self._metadatas
+            results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+            k = min(n_results, len(rows))
+            for row_scores in scores:
+                if k:
+                    top = np.argpartition(-row_scores, k - 1)[:k]
+                    top = top[np.argsort(-row_scores[top], kind="stable")]
+                else:
+                    top = np.zeros(0, dtype=np.int64)
+                distances = 2 - 2 * row_scores[top]
+                top = rows[top]
+                results["ids"].append([ids[row] for row in top])
+                results["documents"].append([documents[row] for row in top])
+                results["metadatas"].append([metadatas[row] for row in top])
+                results["distances"].append([float(distance) for distance in distances])
+        results["embeddings"] = None
+        results["included"] = ["metadatas", "documents", "distances"]
+        return results
+
+
+def create_backend(name: Optional[str] = None, directory: Optional[str] = None) -> VectorBackend:
+    """Open the ``name`` backend (default ``SME_VECTOR_BACKEND``), persisted under ``directory`` if given"""
+    name = (name or VECTOR_BACKEND).lower()
+    if name == "chroma":
+        return ChromaBackend(directory)
+    if name == "numpy":
+        return NumpyBackend(os.path.join(directory, "numpy_index") if directory else None)
+    raise ValueError(f"Unknown SME_VECTOR_BACKEND: {name}")
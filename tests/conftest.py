@@ -0,0 +1,72 @@
+"""
+Shared fixtures: ``src`` on the import path and a local fake LLM server
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """Speaks Ollama's streaming ``/api/generate`` API on an ephemeral port
+
+    Replies ``reply`` (default: "Answer to <prompt>") in word chunks,
+    ``delay`` seconds apart, and counts the generations it runs. With
+    ``fail`` set it sends one chunk and hangs up mid-stream.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeOllamaHandler)
+        self.reply = None
+        self.delay = 0.0
+        self.fail = False
+        self.generations = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.generations += 1
+        reply = server.reply if server.reply is not None else f"Answer to {request['prompt']}"
+        words = reply.split(' ')
+        chunks = [word + ' ' for word in words[:-1]] + words[-1:]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        for chunk in chunks:
+            if server.delay:
+                time.sleep(server.delay)
+            self.wfile.write(json.dumps({"model": request['model'], "response": chunk, "done": False}).encode() + b"\n")
+            self.wfile.flush()
+            if server.fail:
+                return
+        self.wfile.write(json.dumps({"model": request['model'], "response": "", "done": True}).encode() + b"\n")
+
+
+@pytest.fixture
+def fake_ollama():
+    server = FakeOllamaServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
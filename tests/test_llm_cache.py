@@ -0,0 +1,119 @@
+"""
+CachedLLM against a fake Ollama server: hits, persistence, coalescing,
+failed generations and eviction
+"""
+import threading
+import time
+
+import pytest
+
+from llm import OllamaHTTPLLM
+from llm_cache import CachedLLM
+
+
+def answer(llm, prompt: str) -> str:
+    return "".join(chunk.content for chunk in llm.stream(prompt))
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "llm_cache.sqlite")
+
+
+def test_repeated_prompt_is_served_from_cache(fake_ollama, cache_path):
+    cached = CachedLLM(OllamaHTTPLLM("test-model", base_url=fake_ollama.url), cache_path)
+
+    assert answer(cached, "profit in May") == "Answer to profit in May"
+    assert answer(cached, "profit in May") == "Answer to profit in May"
+
+    assert fake_ollama.generations == 1
+    assert cached.stats()["hits"] == 1
+    assert cached.stats()["misses"] == 1
+
+
+def test_cache_persists_across_instances(fake_ollama, cache_path):
+    answer(CachedLLM(OllamaHTTPLLM("test-model", base_url=fake_ollama.url), cache_path), "profit in May")
+
+    reopened = CachedLLM(OllamaHTTPLLM("test-model", base_url=fake_ollama.url), cache_path)
+    assert answer(reopened, "profit in May") == "Answer to profit in May"
+    assert fake_ollama.generations == 1
+    assert reopened.stats()["hits"] == 1
+
+
+def test_cache_key_includes_model_and_temperature(fake_ollama, cache_path):
+    answer(CachedLLM(OllamaHTTPLLM("test-model", 0.1, base_url=fake_ollama.url), cache_path), "profit in May")
+    answer(CachedLLM(OllamaHTTPLLM("test-model", 0.7, base_url=fake_ollama.url), cache_path), "profit in May")
+    answer(CachedLLM(OllamaHTTPLLM("other-model", 0.1, base_url=fake_ollama.url), cache_path), "profit in May")
+    assert fake_ollama.generations == 3
+
+
+def test_concurrent_identical_prompts_share_one_generation(fake_ollama, cache_path):
+    fake_ollama.reply = "Profit in May was ₹235,000 on sales of ₹625,000"
+    fake_ollama.delay = 0.02
+    cached = CachedLLM(OllamaHTTPLLM("test-model", base_url=fake_ollama.url), cache_path)
+    callers = 20
+    start = threading.Barrier(callers)
+    results = [None] * callers
+
+    def ask(i):
+        start.wait()
+        results[i] = answer(cached, "profit in May")
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert results == [fake_ollama.reply] * callers
+    assert fake_ollama.generations == 1
+    stats = cached.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] + stats["coalesced"] == callers - 1
+    assert stats["size"] == 1
+
+
+def test_failed_generation_is_not_cached(fake_ollama, cache_path):
+    cached = CachedLLM(OllamaHTTPLLM("test-model", base_url=fake_ollama.url), cache_path)
+    fake_ollama.fail = True
+    with pytest.raises(ConnectionError):
+        answer(cached, "profit in May")
+    assert cached.stats()["size"] == 0
+
+    fake_ollama.fail = False
+    assert answer(cached, "profit in May") == "Answer to profit in May"
+    assert fake_ollama.generations == 2
+    assert cached.stats()["size"] == 1
+
+
+def test_unreachable_server_is_not_cached(cache_path):
+    cached = CachedLLM(OllamaHTTPLLM("test-model", base_url="http://127.0.0.1:9", timeout=5), cache_path)
+    with pytest.raises(OSError):
+        answer(cached, "profit in May")
+    assert cached.stats()["size"] == 0
+
+
+def test_oldest_responses_are_evicted_beyond_maxsize(fake_ollama, cache_path):
+    cached = CachedLLM(OllamaHTTPLLM("test-model", base_url=fake_ollama.url), cache_path, maxsize=2)
+    for prompt in ["first", "second", "third"]:
+        answer(cached, prompt)
+        time.sleep(0.01)
+
+    assert cached.stats()["size"] == 2
+    assert cached.stats()["evicted"] == 1
+    answer(cached, "third")
+    assert fake_ollama.generations == 3
+    answer(cached, "first")
+    assert fake_ollama.generations == 4
+
+
+def test_expired_responses_are_regenerated(fake_ollama, cache_path):
+    cached = CachedLLM(OllamaHTTPLLM("test-model", base_url=fake_ollama.url), cache_path, ttl=0.2)
+    answer(cached, "profit in May")
+    answer(cached, "profit in May")
+    assert fake_ollama.generations == 1
+
+    time.sleep(0.3)
+    answer(cached, "profit in May")
+    assert fake_ollama.generations == 2
+    assert cached.stats()["size"] == 1
@@ -4,17 +4,115 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from sme_business_agent import SimpleBusinessAgent
 from http.server import HTTPServer, SimpleHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+import argparse
 import json
-from urllib.parse import parse_qs
+import threading
+from urllib.parse import parse_qs, urlsplit
 import webbrowser
 
+DEFAULT_WORKERS = int(os.environ.get("SME_WEB_WORKERS", min(32, (os.cpu_count() or 1) * 4)))
+DEFAULT_MAX_PENDING = int(os.environ.get("SME_WEB_MAX_PENDING", 64))
+DEFAULT_REQUEST_TIMEOUT = float(os.environ.get("SME_WEB_REQUEST_TIMEOUT", 15))
+
+# Process-wide agent, created once and shared by every request
+_agent = None
+_agent_lock = threading.Lock()
+
+def get_agent() -> SimpleBusinessAgent:
+    """Return the shared agent
+    
+    Its data is kept current by a background watcher rather than checked
+    on every request.
+    """
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                agent = SimpleBusinessAgent()
+                agent.start_watching()
+                _agent = agent
+    return _agent
+
+class PooledHTTPServer(HTTPServer):
+    """HTTP server that serves connections on a bounded worker pool
+    
+    Connections beyond ``workers + max_pending`` are rejected with 503
+    instead of queueing without limit, so a burst of traffic can't pile up
+    unbounded work behind slow queries.
+    """
+    
+    def __init__(self, server_address, handler_class, workers: int = DEFAULT_WORKERS,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sme-http")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+    
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            try:
+                request.sendall(
+                    b"HTTP/1.1 503 Service Unavailable\r\n"
+                    b"Content-Length: 0\r\nRetry-After: 1\r\nConnection: close\r\n\r\n"
+                )
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._process_request_worker, request, client_address)
+    
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+    
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
 class SMEHandler(SimpleHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive between requests; ``timeout`` bounds
+    # how long a slow or idle client may hold a worker
+    protocol_version = "HTTP/1.1"
+    timeout = DEFAULT_REQUEST_TIMEOUT
+    
+    def _send_body(self, status: int, body: str, content_type: str):
+        """Send a complete response with Content-Length so keep-alive works"""
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _send_events(self, pieces):
+        """Send text pieces as server-sent events, each as soon as it is ready
+        
+        The length isn't known up front, so the connection closes after the
+        final ``done`` event.
+        """
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for piece in pieces:
+                self.wfile.write(f"data: {json.dumps(piece)}\n\n".encode())
+            self.wfile.write(b"event: done\ndata: \n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The browser went away mid-answer
+            pass
+    
     def do_GET(self):
-        if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            
+        url = urlsplit(self.path)
+        if url.path == '/':
             html = """
             <!DOCTYPE html>
             <html>
@@ -129,14 +227,20 @@ class SMEHandler(SimpleHTTPRequestHandler):
                         
                         const loadingDiv = addToChat('🤖 AI Assistant: Analyzing your request...', 'ai');
                         
-                        fetch('/ask?q=' + encodeURIComponent(question))
-                            .then(response => response.text())
-                            .then(answer => {
-                                loadingDiv.innerHTML = '<strong>🤖 AI Assistant:</strong> ' + answer;
-                            })
-                            .catch(error => {
+                        // Render the answer as it streams in
+                        const source = new EventSource('/stream?q=' + encodeURIComponent(question));
+                        let answer = '';
+                        source.onmessage = event => {
+                            answer += JSON.parse(event.data);
+                            loadingDiv.innerHTML = '<strong>🤖 AI Assistant:</strong> ' + answer;
+                        };
+                        source.addEventListener('done', () => source.close());
+                        source.onerror = () => {
+                            source.close();
+                            if (!answer) {
                                 loadingDiv.innerHTML = '<strong>🤖 AI Assistant:</strong> Sorry, there was an error processing your request.';
-                            });
+                            }
+                        };
                     }
                     
                     function askQuestion(q) {
@@ -161,23 +265,59 @@ class SMEHandler(SimpleHTTPRequestHandler):
             </body>
             </html>
             """
-            self.wfile.write(html.encode())
+            self._send_body(200, html, 'text/html; charset=utf-8')
         
-        elif self.path.startswith('/ask'):
-            query = parse_qs(self.path.split('?')[1])['q'][0]
-            agent = SimpleBusinessAgent()
+        elif url.path == '/ask':
+            query = parse_qs(url.query).get('q', [''])[0].strip()
+            if not query:
+                self._send_body(400, "Missing question parameter 'q'", 'text/plain; charset=utf-8')
+                return
+            agent = get_agent()
             response = agent.simple_query(query)
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(response.encode())
+            self._send_body(200, response, 'text/plain; charset=utf-8')
+        
+        elif url.path == '/stream':
+            query = parse_qs(url.query).get('q', [''])[0].strip()
+            if not query:
+                self._send_body(400, "Missing question parameter 'q'", 'text/plain; charset=utf-8')
+                return
+            self._send_events(get_agent().stream_query(query))
+        
+        elif url.path == '/stats':
+            self._send_body(200, json.dumps(get_agent().cache_stats(), indent=2), 'application/json')
+        
+        else:
+            self.send_error(404)
 
-def run_simple_server():
-    server = HTTPServer(('localhost', 8000), SMEHandler)
-    print("🚀 Starting SME Business AI Agent at http://localhost:8000")
-    webbrowser.open('http://localhost:8000')
-    server.serve_forever()
+def run_simple_server(host: str = 'localhost', port: int = 8000, workers: int = DEFAULT_WORKERS,
+                      max_pending: int = DEFAULT_MAX_PENDING,
+                      request_timeout: float = DEFAULT_REQUEST_TIMEOUT, open_browser: bool = True):
+    # Load the data once up front so the first question doesn't pay for it
+    get_agent()
+    SMEHandler.timeout = request_timeout
+    server = PooledHTTPServer((host, port), SMEHandler, workers=workers, max_pending=max_pending)
+    url = f"http://{host}:{port}"
+    print(f"🚀 Starting SME Business AI Agent at {url} ({workers} workers)")
+    if open_browser:
+        webbrowser.open(url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
 
 if __name__ == "__main__":
-    run_simple_server()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="SME Business AI Agent web interface")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="number of requests served concurrently")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="connections allowed to wait for a worker before returning 503")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT,
+                        help="seconds a slow or idle keep-alive client may hold a worker")
+    parser.add_argument("--no-browser", action="store_true", help="don't open a browser window")
+    args = parser.parse_args()
+    run_simple_server(args.host, args.port, args.workers, args.max_pending, args.timeout,
+                      open_browser=not args.no_browser)
\ No newline at end of file